@@ -7,33 +7,45 @@ A minimal but functional framework for testing AI agents on web-based tasks.
 __version__ = "0.1.0"
 __author__ = "Agent Evaluation Framework"
 
-from .controller.evaluation_controller import EvaluationController
-from .environment.web_environment import WebEnvironment
-from .agent.base_agent import BaseAgent
-from .agent.uitars_agent import UITARSAgent
-from .agent.uitars_pro import UITARSProAgent
-from .agent.text_agent import TextAgent
-
-# Import batch functionality
-try:
-    from .batch.batch_controller import BatchEvaluationController
-    from .batch.batch_config import BatchConfig, load_batch_config, create_sample_batch_config
-    from .batch.batch_aggregator import BatchResultsAggregator
-
-    __all__ = [
-        "EvaluationController",
-        "WebEnvironment",
-        "BaseAgent",
-        "BatchEvaluationController",
-        "BatchConfig",
-        "load_batch_config",
-        "create_sample_batch_config",
-        "BatchResultsAggregator"
-    ]
-except ImportError:
-    # Batch functionality not available (missing dependencies)
-    __all__ = [
-        "EvaluationController",
-        "WebEnvironment",
-        "BaseAgent"
-    ]
+import importlib
+
+# Public names are imported lazily on first access (PEP 562), so importing the
+# package does not pull in playwright, the LLM clients, or the batch subsystem.
+_LAZY_IMPORTS = {
+    "EvaluationController": ".controller.evaluation_controller",
+    "WebEnvironment": ".environment.web_environment",
+    "BaseAgent": ".agent.base_agent",
+    "UITARSAgent": ".agent.uitars_agent",
+    "UITARSProAgent": ".agent.uitars_pro",
+    "TextAgent": ".agent.text_agent",
+    # Batch functionality (raises ImportError on access if dependencies are missing)
+    "BatchEvaluationController": ".batch.batch_controller",
+    "BatchConfig": ".batch.batch_config",
+    "load_batch_config": ".batch.batch_config",
+    "create_sample_batch_config": ".batch.batch_config",
+    "BatchResultsAggregator": ".batch.batch_aggregator",
+}
+
+__all__ = [
+    "EvaluationController",
+    "WebEnvironment",
+    "BaseAgent",
+    "BatchEvaluationController",
+    "BatchConfig",
+    "load_batch_config",
+    "create_sample_batch_config",
+    "BatchResultsAggregator"
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -1,11 +1,15 @@
 """Base Agent Module - Simplified agent interface."""
 
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-from PIL import Image
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, ClassVar, FrozenSet, Tuple, Union
 from pydantic import BaseModel
 from loguru import logger
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 
 class ActionCommand(BaseModel):
     """Structured action command that can be executed by the environment."""
@@ -27,19 +31,59 @@ class AgentResponse(BaseModel):
 class BaseAgent(ABC):
     """Abstract base class for AI agents."""
 
+    # Subclasses that do not declare __slots__ still get a regular __dict__
+    __slots__ = ("config", "agent_type", "timeout", "max_retries", "_static_info")
+
+    # Action types supported by default, shared by every instance
+    _CAPABILITIES: ClassVar[Tuple[str, ...]] = ("click", "scroll", "drag", "input_text", "navigate", "wait")
+
+    # Parameters each action type must provide to pass validation
+    _REQUIRED_PARAMS: ClassVar[Dict[str, FrozenSet[str]]] = {
+        "click": frozenset({"x", "y"}),
+        "scroll": frozenset({"direction", "amount"}),
+        "drag": frozenset({"start_x", "start_y", "end_x", "end_y"}),
+        "input_text": frozenset({"text"}),
+        "navigate": frozenset({"url"}),
+        "wait": frozenset({"duration"}),
+    }
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize the agent with configuration."""
         self.config = config or {}
         self.agent_type = self.config.get("type", "base")
         self.timeout = self.config.get("timeout", 10)
         self.max_retries = self.config.get("max_retries", 3)
+        self._static_info: Optional[Dict[str, Any]] = None
 
-        logger.info(f"Initialized {self.__class__.__name__}")
+        logger.info("Initialized {}", self.__class__.__name__)
 
     @abstractmethod
-    async def predict(self, screenshot: Image.Image, task_description: str) -> AgentResponse:
-        """Process screenshot and task description to generate actions."""
+    async def predict(self, screenshot: Union[bytes, memoryview, Image.Image], task_description: str) -> AgentResponse:
+        """
+        Process screenshot and task description to generate actions.
+
+        The screenshot is usually a PIL image, but agents may also accept the
+        encoded image bytes captured by the browser.
+        """
         pass
+
+    async def predict_batch(self, items: List[Tuple[Image.Image, str]]) -> List[AgentResponse]:
+        """
+        Generate responses for several independent (screenshot, task description) pairs.
+
+        The default implementation calls ``predict`` for each item in turn,
+        because agents keep per-episode state (history, last observation) on
+        the instance. Only stateless subclasses should override this to run
+        the items concurrently or send them to the model in one request.
+
+        Args:
+            items: List of (screenshot, task_description) tuples
+
+        Returns:
+            List[AgentResponse]: One response per item, in input order
+        """
+        return [await self.predict(screenshot, task_description)
+                for screenshot, task_description in items]
     
     def validate_action(self, action: ActionCommand) -> bool:
         """
@@ -51,33 +95,15 @@ class BaseAgent(ABC):
         Returns:
             bool: True if action is valid, False otherwise
         """
-        try:
-            # Check required fields
-            if not action.action_type or not action.parameters:
-                return False
-            
-            # Validate specific action types
-            if action.action_type == "click":
-                return "x" in action.parameters and "y" in action.parameters
-            elif action.action_type == "scroll":
-                return ("direction" in action.parameters and 
-                       "amount" in action.parameters)
-            elif action.action_type == "drag":
-                return all(key in action.parameters for key in 
-                          ["start_x", "start_y", "end_x", "end_y"])
-            elif action.action_type == "input_text":
-                return "text" in action.parameters
-            elif action.action_type == "navigate":
-                return "url" in action.parameters
-            elif action.action_type == "wait":
-                return "duration" in action.parameters
-            else:
-                logger.warning(f"Unknown action type: {action.action_type}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error validating action: {e}")
+        # Check required fields
+        if not action.action_type or not action.parameters:
             return False
+
+        required = self._REQUIRED_PARAMS.get(action.action_type)
+        if required is None:
+            logger.warning(f"Unknown action type: {action.action_type}")
+            return False
+        return required.issubset(action.parameters)
     
     def preprocess_screenshot(self, screenshot: Image.Image) -> Image.Image:
         """
@@ -105,12 +131,16 @@ class BaseAgent(ABC):
         """
         # Validate all actions
         valid_actions = []
+        invalid_actions = []
         for action in response.actions:
             if self.validate_action(action):
                 valid_actions.append(action)
             else:
-                logger.warning(f"Invalid action removed: {action}")
-        
+                invalid_actions.append(action)
+        if invalid_actions:
+            logger.warning("Removed {} invalid action(s)", len(invalid_actions))
+            logger.debug("Invalid actions removed: {}", invalid_actions)
+
         response.actions = valid_actions
         return response
     
@@ -120,29 +150,41 @@ class BaseAgent(ABC):
         
         Called when starting a new evaluation session.
         """
-        logger.info(f"Resetting {self.__class__.__name__}")
+        logger.info("Resetting {}", self.__class__.__name__)
         # Default implementation does nothing
         pass
     
-    def get_capabilities(self) -> List[str]:
+    def get_capabilities(self) -> Tuple[str, ...]:
         """
-        Get list of capabilities supported by this agent.
+        Get capabilities supported by this agent.
         
         Returns:
-            List[str]: List of supported action types
+            Tuple[str, ...]: Supported action types
         """
-        return ["click", "scroll", "drag", "input_text", "navigate", "wait"]
+        return self._CAPABILITIES
     
-    def get_info(self) -> Dict[str, Any]:
+    def _build_static_info(self) -> Dict[str, Any]:
         """
-        Get agent information and metadata.
-        
+        Build the part of the agent info that does not change between tasks.
+
         Returns:
-            Dict[str, Any]: Agent information
+            Dict[str, Any]: Static agent information
         """
         return {
             "name": self.__class__.__name__,
             "type": self.agent_type,
-            "capabilities": self.get_capabilities(),
+            "capabilities": tuple(self.get_capabilities()),
             "config": self.config
         }
+
+    def get_info(self) -> Dict[str, Any]:
+        """
+        Get agent information and metadata.
+        
+        Returns:
+            Dict[str, Any]: Agent information
+        """
+        # Built lazily since subclasses finish configuring themselves after super().__init__
+        if self._static_info is None:
+            self._static_info = self._build_static_info()
+        return dict(self._static_info)
@@ -5,13 +5,53 @@ A human-in-the-loop agent that opens webpages in browser for human interaction
 and waits for human input on task completion.
 """
 
+from __future__ import annotations
+
 import asyncio
+import sys
+import threading
 import webbrowser
-from typing import Dict, Any, Optional, List
-from PIL import Image
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
 from loguru import logger
 
 from .base_agent import BaseAgent, AgentResponse, ActionCommand
+from .stdin_reader import read_line
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# Shared by every human response, which never carries automated actions;
+# a list to match AgentResponse.actions, since model_construct skips validation
+_EMPTY_ACTIONS: List[ActionCommand] = []
+
+# Console text written once per prompt instead of line by line
+_TASK_BANNER_TEMPLATE = (
+    "\n" + "=" * 60 + "\n"
+    "🤖 HUMAN AGENT EVALUATION\n"
+    + "=" * 60 + "\n"
+    "📋 Task #{task_number}\n"
+    "📝 Description: {description}\n"
+    "🌐 Current URL: {url}\n"
+    + "=" * 60 + "\n"
+)
+
+_INSTRUCTIONS_BLOCK = (
+    "📖 Instructions:\n"
+    "1. The webpage should already be open in your browser\n"
+    "2. Complete the task as described above\n"
+    "3. Return to this console when finished\n"
+    "4. Report the completion status\n"
+    + "-" * 60 + "\n"
+)
+
+_COMPLETION_QUESTION = (
+    "\n❓ Did you complete the task successfully?\n"
+    "   Enter 'y' for Yes (success)\n"
+    "   Enter 'n' for No (failure)\n"
+    "   Enter 'r' to retry/continue working\n"
+    "   Enter 'q' to quit evaluation\n"
+)
 
 
 class HumanAgent(BaseAgent):
@@ -21,6 +61,10 @@ class HumanAgent(BaseAgent):
     This agent opens webpages in the default browser and waits for human
     operators to complete tasks manually, then report completion status.
     """
+
+    __slots__ = ("current_url", "task_count", "auto_open_browser", "show_task_dialog", "timeout_minutes")
+
+    _CAPABILITIES = ("manual_interaction", "human_judgment", "complex_reasoning", "visual_assessment")
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize human agent."""
@@ -36,19 +80,19 @@ class HumanAgent(BaseAgent):
         
         logger.info("HumanAgent initialized for manual evaluation")
     
-    async def predict(self, screenshot: Image.Image, task_description: str) -> AgentResponse:
+    async def predict(self, screenshot: Optional[Union[bytes, memoryview, Image.Image]], task_description: str) -> AgentResponse:
         """
         Present task to human operator and wait for completion status.
         
         Args:
-            screenshot: PIL Image of current page state (not used for human agent)
+            screenshot: Current page state, in any form or None (not used for human agent)
             task_description: Text description of the task to perform
             
         Returns:
             AgentResponse: Response based on human input
         """
         self.task_count += 1
-        logger.info(f"Starting human evaluation task {self.task_count}")
+        logger.info("Starting human evaluation task {}", self.task_count)
         
         try:
             # Display task information to human operator
@@ -59,15 +103,15 @@ class HumanAgent(BaseAgent):
             
             # Generate response based on human input
             if completion_status["completed"]:
-                return AgentResponse(
-                    actions=[],  # No automated actions for human agent
+                return AgentResponse.model_construct(
+                    actions=_EMPTY_ACTIONS,  # No automated actions for human agent
                     reasoning=f"Human operator completed task: {completion_status.get('notes', 'No additional notes')}",
                     task_complete=True,
                     needs_more_info=False
                 )
             else:
-                return AgentResponse(
-                    actions=[],
+                return AgentResponse.model_construct(
+                    actions=_EMPTY_ACTIONS,
                     reasoning=f"Human operator reported task failure: {completion_status.get('notes', 'No additional notes')}",
                     task_complete=False,
                     needs_more_info=False,
@@ -76,8 +120,8 @@ class HumanAgent(BaseAgent):
                 
         except Exception as e:
             logger.error(f"Human agent evaluation failed: {e}")
-            return AgentResponse(
-                actions=[],
+            return AgentResponse.model_construct(
+                actions=_EMPTY_ACTIONS,
                 error_message=f"Human evaluation error: {str(e)}",
                 task_complete=False,
                 needs_more_info=False
@@ -85,21 +129,15 @@ class HumanAgent(BaseAgent):
     
     async def _present_task_to_human(self, task_description: str) -> None:
         """Present the task information to the human operator."""
-        print("\n" + "="*60)
-        print("🤖 HUMAN AGENT EVALUATION")
-        print("="*60)
-        print(f"📋 Task #{self.task_count}")
-        print(f"📝 Description: {task_description}")
-        print(f"🌐 Current URL: {self.current_url or 'Not set'}")
-        print("="*60)
-        
+        banner = _TASK_BANNER_TEMPLATE.format(
+            task_number=self.task_count,
+            description=task_description,
+            url=self.current_url or 'Not set'
+        )
         if self.show_task_dialog:
-            print("📖 Instructions:")
-            print("1. The webpage should already be open in your browser")
-            print("2. Complete the task as described above")
-            print("3. Return to this console when finished")
-            print("4. Report the completion status")
-            print("-"*60)
+            banner += _INSTRUCTIONS_BLOCK
+        sys.stdout.write(banner)
+        sys.stdout.flush()
     
     async def _wait_for_human_completion(self, task_description: str) -> Dict[str, Any]:
         """
@@ -108,22 +146,18 @@ class HumanAgent(BaseAgent):
         Returns:
             Dict containing completion status and notes
         """
-        print(f"\n⏳ Waiting for human to complete task...")
-        print(f"💡 Task: {task_description}")
+        sys.stdout.write(f"\n⏳ Waiting for human to complete task...\n💡 Task: {task_description}\n")
         
         while True:
             try:
                 # Get completion status from human
-                print(f"\n❓ Did you complete the task successfully?")
-                print("   Enter 'y' for Yes (success)")
-                print("   Enter 'n' for No (failure)")
-                print("   Enter 'r' to retry/continue working")
-                print("   Enter 'q' to quit evaluation")
+                sys.stdout.write(_COMPLETION_QUESTION)
+                sys.stdout.flush()
                 
-                response = input("👤 Your response (y/n/r/q): ").strip().lower()
+                response = (await self._prompt("👤 Your response (y/n/r/q): ")).strip().lower()
                 
                 if response == 'y':
-                    notes = input("📝 Optional notes about completion (press Enter to skip): ").strip()
+                    notes = (await self._prompt("📝 Optional notes about completion (press Enter to skip): ")).strip()
                     return {
                         "completed": True,
                         "notes": notes or "Task completed successfully",
@@ -131,7 +165,7 @@ class HumanAgent(BaseAgent):
                     }
                 
                 elif response == 'n':
-                    error_reason = input("❌ What went wrong? (optional): ").strip()
+                    error_reason = (await self._prompt("❌ What went wrong? (optional): ")).strip()
                     return {
                         "completed": False,
                         "notes": f"Task failed: {error_reason}" if error_reason else "Task failed",
@@ -156,7 +190,7 @@ class HumanAgent(BaseAgent):
                     print("❌ Invalid response. Please enter 'y', 'n', 'r', or 'q'")
                     continue
                     
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n🛑 Evaluation interrupted by user")
                 return {
                     "completed": False,
@@ -168,6 +202,14 @@ class HumanAgent(BaseAgent):
                 print(f"❌ Error getting user input: {e}")
                 continue
     
+    async def _prompt(self, message: str) -> str:
+        """Read a line from stdin without blocking the event loop."""
+        return await read_line(message)
+
+    def postprocess_response(self, response: AgentResponse) -> AgentResponse:
+        """Return the response unchanged; human responses never carry actions to validate."""
+        return response
+
     def set_current_url(self, url: str, auto_open: bool = None) -> None:
         """Set the current URL being evaluated.
 
@@ -177,21 +219,27 @@ class HumanAgent(BaseAgent):
                       Set to False when WebEnvironment is already handling the browser.
         """
         self.current_url = url
-        logger.info(f"HumanAgent current URL set to: {url}")
+        logger.info("HumanAgent current URL set to: {}", url)
 
         # Determine if we should auto-open browser
         should_auto_open = auto_open if auto_open is not None else self.auto_open_browser
 
         # Optionally open in browser (only if not already handled by WebEnvironment)
         if should_auto_open and url:
-            try:
-                webbrowser.open(url)
-                logger.info(f"HumanAgent opened URL in default browser: {url}")
-            except Exception as e:
-                logger.warning(f"Could not open browser automatically: {e}")
-                print(f"⚠️  Please manually open this URL in your browser: {url}")
+            # Launching the browser can block while the OS spawns it, so do it in the background
+            threading.Thread(target=self._open_in_browser, args=(url,), daemon=True).start()
         else:
-            logger.info(f"HumanAgent skipped browser opening (auto_open={should_auto_open}): {url}")
+            logger.info("HumanAgent skipped browser opening (auto_open={}): {}", should_auto_open, url)
+
+    @staticmethod
+    def _open_in_browser(url: str) -> None:
+        """Open a URL in the default browser, falling back to asking the operator."""
+        try:
+            webbrowser.open(url)
+            logger.info("HumanAgent opened URL in default browser: {}", url)
+        except Exception as e:
+            logger.warning(f"Could not open browser automatically: {e}")
+            print(f"⚠️  Please manually open this URL in your browser: {url}")
     
     async def reset(self) -> None:
         """Reset human agent state."""
@@ -200,19 +248,24 @@ class HumanAgent(BaseAgent):
         self.current_url = None
         logger.info("HumanAgent reset")
     
-    def get_capabilities(self) -> List[str]:
+    def get_capabilities(self) -> Tuple[str, ...]:
         """Get human agent capabilities."""
-        return ["manual_interaction", "human_judgment", "complex_reasoning", "visual_assessment"]
+        return self._CAPABILITIES
     
-    def get_info(self) -> Dict[str, Any]:
-        """Get human agent information."""
-        info = super().get_info()
+    def _build_static_info(self) -> Dict[str, Any]:
+        """Build static human agent information."""
+        info = super()._build_static_info()
         info.update({
             "description": "Human-in-the-loop agent for manual evaluation",
             "interaction_mode": "manual",
             "requires_human_operator": True,
             "auto_open_browser": self.auto_open_browser,
-            "timeout_minutes": self.timeout_minutes,
-            "tasks_completed": self.task_count
+            "timeout_minutes": self.timeout_minutes
         })
         return info
+
+    def get_info(self) -> Dict[str, Any]:
+        """Get human agent information."""
+        info = super().get_info()
+        info["tasks_completed"] = self.task_count
+        return info
@@ -6,6 +6,34 @@ for web interaction. Based on the reference prompt patterns but adapted for our
 ActionCommand framework.
 """
 
+import string
+import sys
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """Immutable prompt definition: system intro, few-shot examples, per-step template."""
+    __slots__ = ("intro", "examples", "template", "meta_data", "examples_rendered")
+
+    intro: str
+    examples: Tuple[Tuple[str, str], ...]
+    template: str
+    meta_data: Mapping[str, Any]
+
+    def __post_init__(self):
+        # Few-shot block rendered once, ready to append to a prompt (not a dataclass field)
+        rendered = ""
+        if self.examples:
+            rendered = "Examples:\n" + "".join(
+                f"\nInput:\n{example_input}\nOutput:\n{example_output}\n"
+                for example_input, example_output in self.examples
+            )
+        object.__setattr__(self, "examples_rendered", rendered)
+
+
 # Direct prompt template for text-based web interaction
 # TEXT_AGENT_DIRECT_PROMPT = {
 #     "intro": """You are an autonomous intelligent agent tasked with navigating web pages using text-based information. You will be given web-based tasks and must accomplish them through specific actions.
@@ -101,8 +129,8 @@ ActionCommand framework.
 # }
 
 # Chain-of-thought prompt template for more complex reasoning
-TEXT_AGENT_COT_PROMPT = {
-    "intro": """You are an autonomous intelligent agent tasked with selecting dates and times on web-based interfaces. You will be given web-based tasks related to date/time selection and must accomplish them through careful analysis and step-by-step reasoning.
+TEXT_AGENT_COT_PROMPT = PromptTemplate(
+    intro="""You are an autonomous intelligent agent tasked with selecting dates and times on web-based interfaces. You will be given web-based tasks related to date/time selection and must accomplish them through careful analysis and step-by-step reasoning.
 Here's the information you'll have:
 - The user's objective: This is the task you're trying to complete.
 - The current web page's accessibility tree: This provides semantic information about interactive elements on the page.
@@ -129,7 +157,7 @@ To be successful, it is very important to follow the following rules:
 6. Some elements may not be visible initially and require scrolling to be selected. If an element is not responding to interaction, try scrolling first to ensure it is fully visible and accessible.
 """,
 
-    "examples": [
+    examples=(
         (
             """ACCESSIBILITY TREE:
 [1] RootWebArea 'Login Page'
@@ -194,16 +222,16 @@ PREVIOUS ACTION: None""",
 4. **Element Positioning**: The checkout button is typically positioned prominently at the bottom of the cart summary, likely in the lower portion of the cart area.
 
 Action: click(400, 350)"""
-        )
-    ],
+        ),
+    ),
 
-    "template": """ACCESSIBILITY TREE:
+    template="""ACCESSIBILITY TREE:
 {accessibility_tree}
 OBJECTIVE: {objective}
 PREVIOUS ACTION: {previous_action}
 CURRENT SELECTED DATA: {current_selected_data}""",
 
-    "meta_data": {
+    meta_data=MappingProxyType({
         "observation_type": "accessibility_tree",
         "action_type": "text_based_coordinates",
         "keywords": ["accessibility_tree", "url", "objective", "previous_action"],
@@ -211,8 +239,8 @@ CURRENT SELECTED DATA: {current_selected_data}""",
         "answer_phrase": "Action:",
         "action_splitter": "Action:",
         "max_text_length": 4096
-    }
-}
+    })
+)
 
 # # Simplified prompt for basic interactions
 # TEXT_AGENT_SIMPLE_PROMPT = {
@@ -275,3 +303,33 @@ AVAILABLE_PROMPTS = {
     "cot": TEXT_AGENT_COT_PROMPT,
     # "simple": TEXT_AGENT_SIMPLE_PROMPT
 }
+
+
+def _split_template(template: str):
+    """Split a format template into literal fragments and interned field names."""
+    fragments, fields = [], []
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        fragments.append(literal)
+        if field_name is not None:
+            fields.append(sys.intern(field_name))
+    if len(fragments) == len(fields):
+        fragments.append("")
+    return tuple(fragments), tuple(fields)
+
+
+_COT_FRAGMENTS, _COT_FIELDS = _split_template(TEXT_AGENT_COT_PROMPT.template)
+
+
+def render_cot_template(accessibility_tree, objective, previous_action, current_selected_data) -> str:
+    """Fill the CoT template; equivalent to ``TEXT_AGENT_COT_PROMPT.template.format(...)``."""
+    values = {
+        "accessibility_tree": accessibility_tree,
+        "objective": objective,
+        "previous_action": previous_action,
+        "current_selected_data": current_selected_data,
+    }
+    parts = [_COT_FRAGMENTS[0]]
+    for field, literal in zip(_COT_FIELDS, _COT_FRAGMENTS[1:]):
+        parts.append(str(values[field]))
+        parts.append(literal)
+    return "".join(parts)
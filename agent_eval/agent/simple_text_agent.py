@@ -8,14 +8,52 @@ Simple Text-Based Agent Implementation
 """
 
 import asyncio
+import io
 import json
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import string
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
 from PIL import Image
 from loguru import logger
 
 from .base_agent import BaseAgent, AgentResponse, ActionCommand
-from .prompts.text_agent_prompts import AVAILABLE_PROMPTS
+from .prompts.text_agent_prompts import AVAILABLE_PROMPTS, PromptTemplate
+
+
+# 动作解析用的正则表达式（模块加载时编译一次）
+_ACTION_RE = re.compile(r'Action:\s*(.+)', re.IGNORECASE)
+_DONE_RE = re.compile(r'complete|done|finished|success', re.IGNORECASE)
+_INPUT_RE = re.compile(r"input_text\s*\(\s*['\"]([^'\"]*)['\"]?\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*(true|false))?\s*\)")
+
+# finish()没有参数，所有完成动作共享同一个实例（下游不会修改动作）
+_FINISH_ACTION = ActionCommand(
+    action_type="finish",
+    parameters={},
+    description="Task completed",
+    confidence=1.0
+)
+
+
+def _prepare_prompt(prompt_template: PromptTemplate) -> Tuple[PromptTemplate, Tuple[str, ...], str]:
+    """预处理prompt：解析模板字段，构建指令和示例组成的静态前缀"""
+    template_fields = tuple(
+        field_name for _, field_name, _, _ in string.Formatter().parse(prompt_template.template)
+        if field_name
+    )
+    prompt_prefix = (
+        f"{prompt_template.intro}\n\n"
+        f"{prompt_template.examples_rendered}"
+        "\nNow solve this:\n"
+    )
+    return prompt_template, template_fields, prompt_prefix
+
+
+_DEFAULT_PROMPT_TYPE = "cot"
+_BUILT_PROMPTS_SIZE = 4
+_PROMPT_CACHE: Dict[str, Tuple[PromptTemplate, Tuple[str, ...], str]] = {
+    name: _prepare_prompt(prompt_template) for name, prompt_template in AVAILABLE_PROMPTS.items()
+}
 
 
 class SimpleTextAgent(BaseAgent):
@@ -23,6 +61,14 @@ class SimpleTextAgent(BaseAgent):
     简洁的文本代理，专注于核心的LLM调用逻辑
     """
 
+    __slots__ = (
+        "observation_type", "current_viewport_only", "max_text_length",
+        "llm_provider", "llm_model", "temperature", "llm_api_key", "llm_base_url", "llm_timeout",
+        "_http",
+        "prompt_type", "prompt_template", "_template_fields", "_prompt_prefix", "_built_prompts",
+        "web_environment", "action_history", "_action_parsers",
+    )
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化TextAgent"""
         super().__init__(config)
@@ -36,18 +82,41 @@ class SimpleTextAgent(BaseAgent):
         self.llm_provider = self.config.get("llm_provider", "openai")
         self.llm_model = self.config.get("llm_model", "gpt-4")
         self.temperature = self.config.get("temperature", 0.1)
+        # 配置了llm_api_key时调用OpenAI兼容接口，否则使用模拟响应
+        self.llm_api_key = self.config.get("llm_api_key")
+        self.llm_base_url = self.config.get("llm_base_url", "https://api.openai.com/v1").rstrip("/")
+        self.llm_timeout = self.config.get("llm_timeout", 60.0)
+        
+        # 共享的HTTP连接池（首次调用时创建，跨step复用keep-alive连接）
+        self._http = None
         
         # Prompt设置
-        self.prompt_type = self.config.get("prompt_type", "simple")
-        self.prompt_template = AVAILABLE_PROMPTS.get(self.prompt_type, AVAILABLE_PROMPTS["simple"])
+        self.prompt_type = self.config.get("prompt_type", _DEFAULT_PROMPT_TYPE)
+        if self.prompt_type not in _PROMPT_CACHE:
+            logger.warning("Unknown prompt_type {}, using {}", self.prompt_type, _DEFAULT_PROMPT_TYPE)
+        # 模板、字段和静态前缀在模块加载时已准备好
+        self.prompt_template, self._template_fields, self._prompt_prefix = _PROMPT_CACHE.get(
+            self.prompt_type, _PROMPT_CACHE[_DEFAULT_PROMPT_TYPE]
+        )
+        
+        # 最近构建的prompt，key为(text_info, task_description, previous_action)
+        self._built_prompts: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
         
         # WebEnvironment引用
         self.web_environment = None
         
-        # 历史记录
-        self.action_history: List[str] = []
+        # 历史记录（deque自动丢弃最旧的记录，保持最近10条）
+        self.action_history: Deque[str] = deque(maxlen=10)
+        
+        # 动作名 -> 解析函数
+        self._action_parsers = {
+            "click": self._parse_click_action,
+            "input_text": self._parse_input_action,
+            "scroll": self._parse_scroll_action,
+            "finish": self._parse_finish_action,
+        }
         
-        logger.info(f"SimpleTextAgent initialized with prompt_type: {self.prompt_type}")
+        logger.info("SimpleTextAgent initialized with prompt_type: {}", self.prompt_type)
 
     def set_web_environment(self, web_env):
         """设置WebEnvironment实例"""
@@ -59,7 +128,7 @@ class SimpleTextAgent(BaseAgent):
         核心预测方法：提取文本 -> 构建prompt -> 调用LLM -> 解析响应
         """
         try:
-            logger.info(f"SimpleTextAgent processing task: {task_description[:100]}...")
+            logger.opt(lazy=True).info("SimpleTextAgent processing task: {}...", lambda: task_description[:100])
             
             # 1. 提取页面文本信息
             text_info = await self._extract_page_text_info()
@@ -79,7 +148,7 @@ class SimpleTextAgent(BaseAgent):
             llm_response = await self._call_llm(prompt)
             
             # 4. 解析LLM响应生成ActionCommand
-            actions = await self._parse_llm_response(llm_response, text_info)
+            actions = self._parse_llm_response(llm_response, text_info)
             
             # 5. 生成推理说明
             reasoning = self._generate_reasoning(text_info, task_description, actions, llm_response)
@@ -114,16 +183,19 @@ class SimpleTextAgent(BaseAgent):
             return None
         
         try:
+            max_text_length = self.max_text_length
+            # 让环境端提前截断（多取一点以便判断是否发生了截断）
             text_info = await self.web_environment.get_page_text_info(
                 observation_type=self.observation_type,
-                current_viewport_only=self.current_viewport_only
+                current_viewport_only=self.current_viewport_only,
+                max_chars=max_text_length + 64
             )
             
             # 截断过长的文本
-            if len(text_info) > self.max_text_length:
-                text_info = text_info[:self.max_text_length] + "\n... (truncated)"
+            if len(text_info) > max_text_length:
+                text_info = text_info[:max_text_length] + "\n... (truncated)"
             
-            logger.debug(f"Extracted {len(text_info)} characters of text information")
+            logger.debug("Extracted {} characters of text information", len(text_info))
             return text_info
             
         except Exception as e:
@@ -132,48 +204,95 @@ class SimpleTextAgent(BaseAgent):
 
     def _build_prompt(self, text_info: str, task_description: str) -> str:
         """构建发送给LLM的prompt"""
+        previous_action = self.action_history[-1] if self.action_history else "None"
+        
+        # 重试同一步时输入相同，直接复用之前构建的prompt
+        cache_key = (text_info, task_description, previous_action)
+        cached = self._built_prompts.get(cache_key)
+        if cached is not None:
+            self._built_prompts.move_to_end(cache_key)
+            return cached
+        
         try:
-            # 获取上一个动作的描述
-            previous_action = self.action_history[-1] if self.action_history else "None"
+            # 只准备模板实际用到的字段，模板中其他字段填"None"
+            values = {}
+            for field_name in self._template_fields:
+                if field_name == "accessibility_tree":
+                    values[field_name] = text_info
+                elif field_name == "objective":
+                    values[field_name] = task_description
+                elif field_name == "previous_action":
+                    values[field_name] = previous_action
+                else:
+                    values[field_name] = "None"
             
-            # 使用prompt模板构建完整prompt
-            prompt = self.prompt_template["template"].format(
-                accessibility_tree=text_info,
-                objective=task_description,
-                previous_action=previous_action
-            )
-            
-            # 添加指令和示例
-            full_prompt = f"{self.prompt_template['intro']}\n\n"
-            
-            if self.prompt_template.get("examples"):
-                full_prompt += "Examples:\n"
-                for example_input, example_output in self.prompt_template["examples"]:
-                    full_prompt += f"\nInput:\n{example_input}\n"
-                    full_prompt += f"Output:\n{example_output}\n"
-            
-            full_prompt += f"\nNow solve this:\n{prompt}\n"
-            
-            return full_prompt
+            # 使用prompt模板构建完整prompt，并拼接预先构建好的指令和示例前缀
+            prompt = self.prompt_template.template.format(**values)
+            full_prompt = f"{self._prompt_prefix}{prompt}\n"
             
         except Exception as e:
             logger.error(f"Failed to build prompt: {e}")
             return f"Task: {task_description}\nPage: {text_info[:500]}..."
+        
+        self._built_prompts[cache_key] = full_prompt
+        if len(self._built_prompts) > _BUILT_PROMPTS_SIZE:
+            self._built_prompts.popitem(last=False)
+        return full_prompt
+
+    def _get_http_client(self):
+        """获取共享的HTTP客户端，连接在多次调用之间保持复用"""
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=30.0
+                ),
+                timeout=self.llm_timeout
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """关闭HTTP连接池"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def reset(self) -> None:
+        """重置Agent状态并释放连接"""
+        await super().reset()
+        self.action_history.clear()
+        await self.aclose()
 
     async def _call_llm(self, prompt: str) -> str:
         """
         调用LLM获取响应
         
-        TODO: 这里需要实现真正的LLM调用
-        目前是模拟实现
+        配置了llm_api_key时请求OpenAI兼容的chat completions接口，
+        否则返回模拟响应
         """
         try:
+            if self.llm_api_key:
+                response = await self._get_http_client().post(
+                    f"{self.llm_base_url}/chat/completions",
+                    headers={"Authorization": f"Bearer {self.llm_api_key}"},
+                    json={
+                        "model": self.llm_model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "temperature": self.temperature
+                    }
+                )
+                response.raise_for_status()
+                return response.json()["choices"][0]["message"]["content"]
+            
             # 模拟LLM响应
-            if "click" in prompt.lower() and "button" in prompt.lower():
+            prompt_lower = prompt.lower()
+            if "click" in prompt_lower and "button" in prompt_lower:
                 return "I need to click the button. Action: click(300, 150)"
-            elif "search" in prompt.lower() and "textbox" in prompt.lower():
+            elif "search" in prompt_lower and "textbox" in prompt_lower:
                 return "I need to enter text in the search box. Action: input_text('search term', 400, 100, true)"
-            elif "finish" in prompt.lower() or "complete" in prompt.lower():
+            elif "finish" in prompt_lower or "complete" in prompt_lower:
                 return "Task appears to be complete. Action: finish()"
             else:
                 return "I need to analyze the page further. Action: click(400, 200)"
@@ -182,148 +301,128 @@ class SimpleTextAgent(BaseAgent):
             logger.error(f"LLM call failed: {e}")
             return "Error occurred. Action: finish()"
 
-    async def _parse_llm_response(self, llm_response: str, text_info: str) -> List[ActionCommand]:
+    def _parse_llm_response(self, llm_response: str, text_info: str) -> List[ActionCommand]:
         """解析LLM响应生成ActionCommand"""
         actions = []
         
         try:
             # 提取Action部分
-            action_match = re.search(r'Action:\s*(.+)', llm_response, re.IGNORECASE)
+            action_match = _ACTION_RE.search(llm_response)
             if not action_match:
                 logger.warning("No action found in LLM response")
                 return actions
             
             action_str = action_match.group(1).strip()
             
-            # 解析不同类型的动作
-            if action_str.startswith("click("):
-                action = await self._parse_click_action(action_str, text_info)
-                if action:
-                    actions.append(action)
-            
-            elif action_str.startswith("input_text("):
-                action = await self._parse_input_action(action_str, text_info)
-                if action:
-                    actions.append(action)
-            
-            elif action_str.startswith("scroll("):
-                action = self._parse_scroll_action(action_str)
+            # 按动作名分发：name(args...)
+            name, paren, rest = action_str.partition("(")
+            close = rest.find(")")
+            if not paren or close == -1:
+                return actions
+            parser = self._action_parsers.get(name)
+            if parser:
+                action = parser(action_str, rest[:close])
                 if action:
                     actions.append(action)
             
-            elif action_str.startswith("finish()"):
-                actions.append(ActionCommand(
-                    action_type="finish",
-                    parameters={},
-                    description="Task completed",
-                    confidence=1.0
-                ))
-            
         except Exception as e:
             logger.error(f"Failed to parse LLM response: {e}")
         
         return actions
 
-    async def _parse_click_action(self, action_str: str, text_info: str) -> Optional[ActionCommand]:
-        """解析点击动作"""
-        try:
-            # 提取坐标
-            coord_match = re.search(r'click\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)', action_str)
-            if coord_match:
-                x, y = int(coord_match.group(1)), int(coord_match.group(2))
-                return ActionCommand(
-                    action_type="click",
-                    parameters={"x": x, "y": y},
-                    description=f"Click at coordinates ({x}, {y})",
-                    confidence=0.8
-                )
-        except Exception as e:
-            logger.error(f"Failed to parse click action: {e}")
-        
-        return None
+    def _parse_click_action(self, action_str: str, args: str) -> Optional[ActionCommand]:
+        """解析点击动作: click(x, y)"""
+        coords = args.split(",")
+        if len(coords) != 2:
+            return None
+        x_str, y_str = coords[0].strip(), coords[1].strip()
+        if not (x_str.isdigit() and y_str.isdigit()):
+            return None
+        x, y = int(x_str), int(y_str)
+        return ActionCommand(
+            action_type="click",
+            parameters={"x": x, "y": y},
+            description=f"Click at coordinates ({x}, {y})",
+            confidence=0.8
+        )
 
-    async def _parse_input_action(self, action_str: str, text_info: str) -> Optional[ActionCommand]:
-        """解析输入动作"""
-        try:
-            # 提取文本和坐标
-            input_match = re.search(r"input_text\s*\(\s*['\"]([^'\"]*)['\"]?\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*(true|false))?\s*\)", action_str)
-            if input_match:
-                text = input_match.group(1)
-                x, y = int(input_match.group(2)), int(input_match.group(3))
-                replace_mode = input_match.group(4) == "true" if input_match.group(4) else True
-                
-                return ActionCommand(
-                    action_type="input_text",
-                    parameters={
-                        "text": text,
-                        "x": x,
-                        "y": y,
-                        "replace_mode": replace_mode
-                    },
-                    description=f"Input '{text}' at coordinates ({x}, {y})",
-                    confidence=0.8
-                )
-        except Exception as e:
-            logger.error(f"Failed to parse input action: {e}")
+    def _parse_input_action(self, action_str: str, args: str) -> Optional[ActionCommand]:
+        """解析输入动作: input_text('text', x, y[, true|false])"""
+        # 文本参数可能包含逗号，仍使用正则解析
+        input_match = _INPUT_RE.search(action_str)
+        if not input_match:
+            return None
+        text = input_match.group(1)
+        x, y = int(input_match.group(2)), int(input_match.group(3))
+        replace_mode = input_match.group(4) == "true" if input_match.group(4) else True
         
-        return None
+        return ActionCommand(
+            action_type="input_text",
+            parameters={
+                "text": text,
+                "x": x,
+                "y": y,
+                "replace_mode": replace_mode
+            },
+            description=f"Input '{text}' at coordinates ({x}, {y})",
+            confidence=0.8
+        )
 
-    def _parse_scroll_action(self, action_str: str) -> Optional[ActionCommand]:
-        """解析滚动动作"""
-        try:
-            scroll_match = re.search(r"scroll\s*\(\s*['\"]?(\w+)['\"]?\s*,\s*(\d+)\s*\)", action_str)
-            if scroll_match:
-                direction, amount = scroll_match.group(1), int(scroll_match.group(2))
-                return ActionCommand(
-                    action_type="scroll",
-                    parameters={
-                        "direction": direction,
-                        "amount": amount,
-                        "dx": 0,
-                        "dy": 0,
-                        "x": None,
-                        "y": None
-                    },
-                    description=f"Scroll {direction} by {amount}",
-                    confidence=0.7
-                )
-        except Exception as e:
-            logger.error(f"Failed to parse scroll action: {e}")
-        
-        return None
+    def _parse_scroll_action(self, action_str: str, args: str) -> Optional[ActionCommand]:
+        """解析滚动动作: scroll(direction, amount)"""
+        scroll_args = args.split(",")
+        if len(scroll_args) != 2:
+            return None
+        direction = scroll_args[0].strip().strip("'\"")
+        amount_str = scroll_args[1].strip()
+        if not direction or not amount_str.isdigit():
+            return None
+        amount = int(amount_str)
+        return ActionCommand(
+            action_type="scroll",
+            parameters={
+                "direction": direction,
+                "amount": amount,
+                "dx": 0,
+                "dy": 0,
+                "x": None,
+                "y": None
+            },
+            description=f"Scroll {direction} by {amount}",
+            confidence=0.7
+        )
+
+    def _parse_finish_action(self, action_str: str, args: str) -> Optional[ActionCommand]:
+        """解析完成动作: finish()"""
+        if args.strip():
+            return None
+        return _FINISH_ACTION
 
     def _generate_reasoning(self, text_info: str, task_description: str, actions: List[ActionCommand], llm_response: str) -> str:
         """生成推理说明"""
-        reasoning_parts = []
-        reasoning_parts.append(f"Task: {task_description}")
-        reasoning_parts.append(f"Page text length: {len(text_info)} characters")
-        reasoning_parts.append(f"LLM response: {llm_response[:200]}...")
+        buf = io.StringIO()
+        buf.write(f"Task: {task_description}\n")
+        buf.write(f"Page text length: {len(text_info)} characters\n")
+        buf.write(f"LLM response: {llm_response[:200]}...\n")
         
         if actions:
-            reasoning_parts.append(f"Generated {len(actions)} action(s):")
+            buf.write(f"Generated {len(actions)} action(s):")
             for i, action in enumerate(actions, 1):
-                reasoning_parts.append(f"  {i}. {action.description}")
+                buf.write(f"\n  {i}. {action.description}")
         else:
-            reasoning_parts.append("No actions generated")
+            buf.write("No actions generated")
         
-        return "\n".join(reasoning_parts)
+        return buf.getvalue()
 
     def _is_task_complete(self, llm_response: str, actions: List[ActionCommand]) -> bool:
         """判断任务是否完成"""
-        # 检查是否有finish动作
-        for action in actions:
-            if action.action_type == "finish":
-                return True
+        # 先检查动作类型（开销小），有finish动作时无需扫描LLM响应
+        if any(action.action_type == "finish" for action in actions):
+            return True
         
         # 检查LLM响应中的完成指示
-        completion_keywords = ["complete", "done", "finished", "success"]
-        return any(keyword in llm_response.lower() for keyword in completion_keywords)
+        return _DONE_RE.search(llm_response) is not None
 
     def _update_history(self, actions: List[ActionCommand]) -> None:
         """更新动作历史"""
-        for action in actions:
-            self.action_history.append(action.description or f"{action.action_type}")
-        
-        # 保持历史记录在合理范围内
-        if len(self.action_history) > 10:
-            self.action_history = self.action_history[-10:]
+        self.action_history.extend(action.description or action.action_type for action in actions)
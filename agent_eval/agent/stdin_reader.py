@@ -0,0 +1,114 @@
+"""
+Shared asynchronous stdin reader for interactive agents.
+"""
+
+import asyncio
+import codecs
+import os
+import sys
+from collections import deque
+from typing import Optional
+
+
+class _StdinDispatcher:
+    """
+    Single stdin reader shared by every interactive agent in the process.
+
+    Registers stdin with the event loop's selector and hands complete lines to
+    waiting prompts in FIFO order, so idle agents do not each hold a thread
+    blocked in input(). Falls back to a worker thread where the loop cannot
+    watch stdin (e.g. Windows proactor loop, stdin redirected from a file).
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fd: Optional[int] = None
+        self._decoder = None
+        self._pending = ""
+        self._waiters: "deque[asyncio.Future]" = deque()
+
+    async def readline(self, prompt: str) -> str:
+        """Write a prompt and wait for the next line of input (without newline)."""
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+
+        loop = asyncio.get_running_loop()
+        if not self._attach(loop):
+            line = await asyncio.to_thread(sys.stdin.readline)
+            if not line:
+                raise EOFError()
+            return line.rstrip("\r\n")
+
+        line = self._pop_line()
+        if line is not None:
+            return line
+
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            return await waiter
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if not self._waiters:
+                self._detach()
+
+    def _attach(self, loop: asyncio.AbstractEventLoop) -> bool:
+        if self._loop is loop:
+            return True
+        self._detach()
+        try:
+            fd = sys.stdin.fileno()
+            loop.add_reader(fd, self._on_readable)
+        except (AttributeError, ValueError, OSError, NotImplementedError):
+            return False
+        self._loop, self._fd = loop, fd
+        self._decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(errors="replace")
+        return True
+
+    def _detach(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._fd)
+        self._loop = None
+        self._fd = None
+
+    def _pop_line(self) -> Optional[str]:
+        newline = self._pending.find("\n")
+        if newline == -1:
+            return None
+        line, self._pending = self._pending[:newline], self._pending[newline + 1:]
+        return line.rstrip("\r")
+
+    def _on_readable(self) -> None:
+        data = os.read(self._fd, 4096)
+        if not data:
+            # stdin closed: fail every waiting prompt the same way input() would
+            self._detach()
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_exception(EOFError())
+            return
+
+        self._pending += self._decoder.decode(data)
+        while self._waiters:
+            if self._waiters[0].done():
+                self._waiters.popleft()
+                continue
+            line = self._pop_line()
+            if line is None:
+                break
+            self._waiters.popleft().set_result(line)
+
+
+_dispatcher = _StdinDispatcher()
+
+
+async def read_line(prompt: str) -> str:
+    """
+    Prompt on stdout and read one line from stdin without blocking the event loop.
+
+    Raises:
+        EOFError: If stdin is closed, like input()
+    """
+    return await _dispatcher.readline(prompt)
@@ -5,11 +5,117 @@ An interactive agent that allows manual control through terminal input.
 Users can input action commands directly via the terminal interface.
 """
 
-from typing import Dict, Any, Optional, List, Tuple
+import sys
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from PIL import Image
 from loguru import logger
 
 from .base_agent import BaseAgent, AgentResponse, ActionCommand
+from .stdin_reader import read_line
+
+
+def _parse_click(parts: List[str]) -> Optional[ActionCommand]:
+    if len(parts) < 3:
+        return None
+    x, y = int(parts[1]), int(parts[2])
+    return ActionCommand(
+        action_type="click",
+        parameters={"x": x, "y": y},
+        description=f"Click at ({x}, {y})"
+    )
+
+
+def _parse_type(parts: List[str]) -> Optional[ActionCommand]:
+    if len(parts) < 2:
+        return None
+    text = " ".join(parts[1:])
+    return ActionCommand(
+        action_type="input_text",
+        parameters={"text": text},
+        description=f"Type: {text[:50]}..."
+    )
+
+
+def _parse_scroll(parts: List[str]) -> Optional[ActionCommand]:
+    if len(parts) < 3:
+        return None
+    direction = parts[1].lower()
+    amount = int(parts[2])
+    return ActionCommand(
+        action_type="scroll",
+        parameters={"direction": direction, "amount": amount},
+        description=f"Scroll {direction} by {amount}"
+    )
+
+
+def _parse_drag(parts: List[str]) -> Optional[ActionCommand]:
+    if len(parts) < 5:
+        return None
+    x1, y1, x2, y2 = int(parts[1]), int(parts[2]), int(parts[3]), int(parts[4])
+    return ActionCommand(
+        action_type="drag",
+        parameters={"start_x": x1, "start_y": y1, "end_x": x2, "end_y": y2},
+        description=f"Drag from ({x1}, {y1}) to ({x2}, {y2})"
+    )
+
+
+def _parse_wait(parts: List[str]) -> Optional[ActionCommand]:
+    if len(parts) < 2:
+        return None
+    duration = float(parts[1])
+    return ActionCommand(
+        action_type="wait",
+        parameters={"duration": duration},
+        description=f"Wait {duration} seconds"
+    )
+
+
+def _parse_navigate(parts: List[str]) -> Optional[ActionCommand]:
+    if len(parts) < 2:
+        return None
+    url = parts[1]
+    return ActionCommand(
+        action_type="navigate",
+        parameters={"url": url},
+        description=f"Navigate to {url}"
+    )
+
+
+_RULE = "=" * 70 + "\n"
+_HEADER_RULE = "\n" + _RULE
+
+# Help text, written in a single call
+_HELP_BANNER = (
+    "\n📖 AVAILABLE ACTIONS:\n"
+    "  click <x> <y>           - Click at coordinates (x, y)\n"
+    "  type <text>             - Type text at current focus\n"
+    "  scroll <direction> <amount> - Scroll (up/down/left/right)\n"
+    "  drag <x1> <y1> <x2> <y2> - Drag from (x1,y1) to (x2,y2)\n"
+    "  wait <seconds>          - Wait for specified seconds\n"
+    "  navigate <url>          - Navigate to URL\n"
+    "  done                    - Mark task as complete\n"
+    "  help                    - Show this help\n"
+    "  quit                    - Exit without completing task\n"
+    "\n💡 TIPS:\n"
+    "  - Enter ONE action at a time for immediate execution\n"
+    "  - Watch the browser window to see results after each action\n"
+    "  - Use 'done' when you think the task is complete\n"
+    "  - Coordinates are in pixels from top-left corner\n"
+    "  - Use browser dev tools (F12) to find coordinates\n"
+    "  - Each action executes through proper evaluation flow\n"
+    + "-" * 70 + "\n"
+)
+
+
+# Terminal command keyword -> parser taking the whitespace-split command
+_ACTION_PARSERS: Dict[str, Callable[[List[str]], Optional[ActionCommand]]] = {
+    "click": _parse_click,
+    "type": _parse_type,
+    "scroll": _parse_scroll,
+    "drag": _parse_drag,
+    "wait": _parse_wait,
+    "navigate": _parse_navigate,
+}
 
 
 class TerminalAgent(BaseAgent):
@@ -19,6 +125,9 @@ class TerminalAgent(BaseAgent):
     This agent prompts the user in the terminal to input action commands,
     coordinates, and parameters, then returns appropriate ActionCommand objects.
     """
+
+    __slots__ = ("task_count", "show_screenshot_info", "show_help_on_start", "single_action_mode",
+                 "current_action_prompt", "user_indicated_completion")
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize terminal agent."""
@@ -49,7 +158,7 @@ class TerminalAgent(BaseAgent):
             AgentResponse: Response with user-inputted actions
         """
         self.task_count += 1
-        logger.info(f"Starting terminal interaction for task {self.task_count}")
+        logger.info("Starting terminal interaction for task {}", self.task_count)
         
         try:
             # Display task information
@@ -87,40 +196,30 @@ class TerminalAgent(BaseAgent):
     
     async def _display_task_info(self, screenshot: Image.Image, task_description: str) -> None:
         """Display task information and screenshot details to user."""
-        print("\n" + "="*70)
-        print("🖥️  TERMINAL AGENT - INTERACTIVE CONTROL")
-        print("="*70)
-        print(f"📋 Task #{self.task_count}")
-        print(f"📝 Description: {task_description}")
+        lines = [
+            _HEADER_RULE,
+            "🖥️  TERMINAL AGENT - INTERACTIVE CONTROL\n",
+            _RULE,
+            f"📋 Task #{self.task_count}\n",
+            f"📝 Description: {task_description}\n",
+        ]
         
         if self.show_screenshot_info and screenshot:
-            print(f"📸 Screenshot: {screenshot.size[0]}x{screenshot.size[1]} pixels")
+            width, height = screenshot.size
+            lines.append(f"📸 Screenshot: {width}x{height} pixels\n")
         
-        print("="*70)
+        lines.append(_RULE)
         
         if self.show_help_on_start and self.task_count == 1:
-            self._display_help()
+            lines.append(_HELP_BANNER)
+        
+        sys.stdout.writelines(lines)
+        sys.stdout.flush()
     
     def _display_help(self) -> None:
         """Display help information about available commands."""
-        print("\n📖 AVAILABLE ACTIONS:")
-        print("  click <x> <y>           - Click at coordinates (x, y)")
-        print("  type <text>             - Type text at current focus")
-        print("  scroll <direction> <amount> - Scroll (up/down/left/right)")
-        print("  drag <x1> <y1> <x2> <y2> - Drag from (x1,y1) to (x2,y2)")
-        print("  wait <seconds>          - Wait for specified seconds")
-        print("  navigate <url>          - Navigate to URL")
-        print("  done                    - Mark task as complete")
-        print("  help                    - Show this help")
-        print("  quit                    - Exit without completing task")
-        print("\n💡 TIPS:")
-        print("  - Enter ONE action at a time for immediate execution")
-        print("  - Watch the browser window to see results after each action")
-        print("  - Use 'done' when you think the task is complete")
-        print("  - Coordinates are in pixels from top-left corner")
-        print("  - Use browser dev tools (F12) to find coordinates")
-        print("  - Each action executes through proper evaluation flow")
-        print("-"*70)
+        sys.stdout.write(_HELP_BANNER)
+        sys.stdout.flush()
 
     async def _collect_single_action(self) -> Tuple[Optional[ActionCommand], bool]:
         """
@@ -140,7 +239,7 @@ class TerminalAgent(BaseAgent):
                 print(f"💡 Action will be executed immediately after you enter it")
                 print(f"👀 Watch the browser window for results")
 
-            user_input = input("👤 Action: ").strip()
+            user_input = (await read_line("👤 Action: ")).strip()
 
             if not user_input:
                 # Empty input, ask again
@@ -183,64 +282,8 @@ class TerminalAgent(BaseAgent):
             if not parts:
                 return None
             
-            action_type = parts[0].lower()
-            
-            if action_type == "click":
-                if len(parts) >= 3:
-                    x, y = int(parts[1]), int(parts[2])
-                    return ActionCommand(
-                        action_type="click",
-                        parameters={"x": x, "y": y},
-                        description=f"Click at ({x}, {y})"
-                    )
-            
-            elif action_type == "type":
-                if len(parts) >= 2:
-                    text = " ".join(parts[1:])
-                    return ActionCommand(
-                        action_type="input_text",
-                        parameters={"text": text},
-                        description=f"Type: {text[:50]}..."
-                    )
-            
-            elif action_type == "scroll":
-                if len(parts) >= 3:
-                    direction = parts[1].lower()
-                    amount = int(parts[2])
-                    return ActionCommand(
-                        action_type="scroll",
-                        parameters={"direction": direction, "amount": amount},
-                        description=f"Scroll {direction} by {amount}"
-                    )
-            
-            elif action_type == "drag":
-                if len(parts) >= 5:
-                    x1, y1, x2, y2 = int(parts[1]), int(parts[2]), int(parts[3]), int(parts[4])
-                    return ActionCommand(
-                        action_type="drag",
-                        parameters={"start_x": x1, "start_y": y1, "end_x": x2, "end_y": y2},
-                        description=f"Drag from ({x1}, {y1}) to ({x2}, {y2})"
-                    )
-            
-            elif action_type == "wait":
-                if len(parts) >= 2:
-                    duration = float(parts[1])
-                    return ActionCommand(
-                        action_type="wait",
-                        parameters={"duration": duration},
-                        description=f"Wait {duration} seconds"
-                    )
-            
-            elif action_type == "navigate":
-                if len(parts) >= 2:
-                    url = parts[1]
-                    return ActionCommand(
-                        action_type="navigate",
-                        parameters={"url": url},
-                        description=f"Navigate to {url}"
-                    )
-            
-            return None
+            parser = _ACTION_PARSERS.get(parts[0].lower())
+            return parser(parts) if parser else None
             
         except (ValueError, IndexError) as e:
             logger.warning(f"Failed to parse action command '{command}': {e}")
@@ -250,7 +293,7 @@ class TerminalAgent(BaseAgent):
         """Ask user if they think the task is complete."""
         try:
             print(f"\n❓ Do you think the task is complete?")
-            response = input("👤 Task complete? (y/n): ").strip().lower()
+            response = (await read_line("👤 Task complete? (y/n): ")).strip().lower()
             return response in ['y', 'yes', 'true', '1']
         except KeyboardInterrupt:
             return False
@@ -7,16 +7,320 @@ solely on visual information from screenshots.
 """
 
 import asyncio
+import hashlib
 import json
 import re
 import os
+import threading
 import aiohttp
-from typing import Dict, Any, List, Optional, Tuple
+import httpx
+import openai
+from collections import OrderedDict, deque
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Any, Deque, Iterable, List, Optional, Tuple
 from PIL import Image
 from loguru import logger
-from openai import OpenAI
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
 
 from .base_agent import BaseAgent, AgentResponse, ActionCommand
+from .prompts.text_agent_prompts import TEXT_AGENT_COT_PROMPT, render_cot_template
+
+
+# Verbs an action line can start with
+_ACTION_VERBS = frozenset(("click", "type", "scroll", "stop", "drag"))
+_ACTION_VERBS_PATTERN = "(?:" + "|".join(sorted(_ACTION_VERBS)) + r")\b"
+
+# Patterns used on every step, compiled once
+# A complete line starting with "Action: <verb>" in a partially streamed response
+_STREAM_ACTION_RE = re.compile(r"^[ \t]*Action:[ \t]*" + _ACTION_VERBS_PATTERN + r"[^\n]*\n", re.MULTILINE)
+# Thought text, up to the first "Action:" label
+_THOUGHT_RE = re.compile(r"Thought:\s*(.*?)(?=\s*Action:|$)", re.DOTALL | re.IGNORECASE)
+# Prefixes a line must start with to be taken as the action
+_ACTION_VERB_PREFIXES = tuple(sorted(_ACTION_VERBS))
+_CLICK_RE = re.compile(r'click\s+(\[?\d+\]?)')
+_TYPE_RE = re.compile(r'type\s+(\[?\d+\]?)\s+(.+)')
+_SCROLL_RE = re.compile(r'scroll\s+(\[?\d+\]?)\s+(.+)')
+_BUTTON_RE = re.compile(r'\[(\d+)\]\s+button\s+[\'"]([^\'"]*)[\'"]')
+_DIR_RE = re.compile(r'\[?direction=(\w+)\]?')
+_DIST_RE = re.compile(r'\[?distance=(\w+)\]?')
+
+# Scroll distance in pixels per distance keyword
+_DISTANCE_MAP = {"small": 33, "medium": 100, "large": 300, "xlarge": 900}
+# Which of (dx, dy) a scroll direction moves along
+_SCROLL_AXIS = {"up": (0, 1), "down": (0, 1), "left": (1, 0), "right": (1, 0)}
+_DIRECTION_KEYWORDS = frozenset(_SCROLL_AXIS)
+# Identical page observations in a row (after the first) before scrolling without the LLM
+_SAME_PAGE_STREAK_LIMIT = 2
+_DISTANCE_KEYWORDS = frozenset(_DISTANCE_MAP)
+
+# One accessibility tree line: "<tabs>[id] role 'name' properties..."
+_AXTREE_LINE_RE = re.compile(r"""^(\t*)\[[^\]]*\] (\S+) ('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")""")
+# Private-use icon font glyphs carry no meaning for the model
+_ICON_GLYPH_RE = re.compile("[\ue600-\ue6ff]")
+# Roles whose StaticText children are kept even when they repeat the parent's name
+_TEXT_CONTAINER_ROLES = frozenset((
+    "article", "paragraph", "heading", "strong", "emphasis", "mark", "sectionheader"
+))
+
+
+def _prune_axtree(text_info: str) -> str:
+    """
+    Drop StaticText lines that add nothing to the accessibility tree text.
+
+    A StaticText line is removed when its text is empty or already contained in
+    its parent's name (unless the parent is a text container such as a
+    paragraph or heading). Private-use icon glyphs are stripped throughout.
+    """
+    text_info = _ICON_GLYPH_RE.sub("", text_info)
+    kept: List[str] = []
+    # (role, name) of the most recent node at each indent depth
+    parents: List[Tuple[str, str]] = []
+    for line in text_info.split("\n"):
+        match = _AXTREE_LINE_RE.match(line)
+        if not match:
+            kept.append(line)
+            continue
+        depth = len(match.group(1))
+        role = match.group(2)
+        name = match.group(3)[1:-1].strip()
+        if role == "StaticText":
+            if not name:
+                continue
+            if 0 < depth <= len(parents):
+                parent_role, parent_name = parents[depth - 1]
+                if parent_role not in _TEXT_CONTAINER_ROLES and name in parent_name:
+                    continue
+        del parents[depth:]
+        parents.append((role, name))
+        kept.append(line)
+    return "\n".join(kept)
+
+# Cheap page version token: a per-document id plus a counter bumped by a
+# MutationObserver and by events that change the accessibility tree without
+# touching the DOM (form values, focus, hover), together with the scroll
+# position and viewport size that the viewport-only tree depends on
+_PAGE_VERSION_JS = """() => {
+    if (window.__axVer === undefined) {
+        window.__axVer = 0;
+        window.__axDoc = Math.random();
+        const bump = () => { window.__axVer++; };
+        new MutationObserver(bump).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        for (const type of ["input", "change", "focusin", "mouseover"]) {
+            document.addEventListener(type, bump, true);
+        }
+    }
+    return [window.__axDoc, window.__axVer, window.scrollX, window.scrollY,
+            window.innerWidth, window.innerHeight];
+}"""
+
+
+def _history_entry_body(entry: Tuple[int, str, str]) -> Tuple[str, str]:
+    """Ignore the step number so repeated steps compare equal."""
+    return entry[1], entry[2]
+
+
+def _compress_history(entries: Iterable[Tuple[int, str, str]]) -> str:
+    """
+    Format (step, thought, action) history entries for the prompt.
+
+    Runs of identical consecutive steps are collapsed into their first entry.
+    """
+    blocks = []
+    for (thought, action), group in groupby(entries, key=_history_entry_body):
+        step = next(group)[0]
+        count = 1 + sum(1 for _ in group)
+        block = f"Step {step}:\nThought: {thought}\nAction: {action}"
+        blocks.append(f"{block}\n(repeated {count} times)" if count > 1 else block)
+    return "\n".join(blocks)
+
+
+class _LLMCache:
+    """
+    Two-tier cache of LLM responses keyed by a hash of the request.
+
+    Recent entries live in an in-memory LRU; every entry is also written to a
+    directory on disk so identical steps are reused across evaluation runs. The
+    disk tier is periodically trimmed back to max_disk_entries files, dropping
+    the least recently used ones. Off by default; set WEBWORLD_LLM_CACHE=1 to
+    enable it.
+    """
+
+    # Check the disk tier size after this many writes
+    _PRUNE_INTERVAL = 64
+
+    def __init__(self, cache_dir: Path, max_entries: int = 512, max_disk_entries: int = 10000):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._writes_since_prune = self._PRUNE_INTERVAL  # Prune on the first write
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system: str, user_message: str) -> str:
+        """Hash everything that determines the model output."""
+        payload = "\x00".join((model, repr(temperature), system, user_message))
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        content = self._memory.get(key)
+        if content is not None:
+            self._memory.move_to_end(key)
+            return content
+        content = await asyncio.to_thread(self._read, key)
+        if content is not None:
+            self._remember(key, content)
+        return content
+
+    async def set(self, key: str, content: str) -> None:
+        """Store a response in both tiers."""
+        self._remember(key, content)
+        await asyncio.to_thread(self._write, key, content)
+
+    def _remember(self, key: str, content: str) -> None:
+        self._memory[key] = content
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self.cache_dir / key
+        try:
+            content = path.read_text(encoding="utf-8")
+            os.utime(path)  # Mark as recently used for _prune
+            return content
+        except OSError:
+            return None
+
+    def _write(self, key: str, content: str) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = self.cache_dir / f"{key}.{os.getpid()}.tmp"
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, self.cache_dir / key)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {key}: {e}")
+            return
+
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= self._PRUNE_INTERVAL:
+            self._writes_since_prune = 0
+            self._prune()
+
+    def _prune(self) -> None:
+        """Delete the least recently used files once the disk tier exceeds max_disk_entries."""
+        try:
+            entries = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and not entry.name.endswith(".tmp")
+            ]
+        except OSError as e:
+            logger.warning(f"Failed to scan LLM cache directory: {e}")
+            return
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.debug(f"Evicted {excess} LLM cache entries from {self.cache_dir}")
+
+
+# API configuration from environment, read once per process
+# 加载 .env 文件
+load_dotenv()
+_API_KEY = os.getenv("OPENAI_API_KEY")
+_BASE_URL = os.getenv("OPENAI_API_BASE_URL", "https://api.openai.com/v1")
+
+# LLM client shared by all TextAgent instances so its connection pool (and the
+# TLS sessions in it) survives from one task to the next. Created on first use.
+_SHARED_CLIENTS_LOCK = threading.Lock()
+_SHARED_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+_SHARED_LLM_CLIENT: Optional[AsyncOpenAI] = None
+
+# Cap on concurrent LLM calls across all TextAgent instances, so parallel
+# evaluators do not trip provider rate limits
+_LLM_CONCURRENCY = int(os.getenv("WEBWORLD_LLM_CONCURRENCY", "8"))
+_LLM_SEMAPHORE: Optional[asyncio.Semaphore] = None
+
+# Per-attempt timeout and retry policy for transient LLM failures
+_LLM_CALL_TIMEOUT = 30.0
+_LLM_MAX_ATTEMPTS = 3
+_LLM_RETRY_BASE_DELAY = 0.5
+_RETRYABLE_LLM_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
+def _get_shared_llm_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client, creating it on first use."""
+    global _SHARED_HTTP_CLIENT, _SHARED_LLM_CLIENT
+    with _SHARED_CLIENTS_LOCK:
+        if _SHARED_LLM_CLIENT is None:
+            # Configure pooled async HTTP client to bypass proxy for direct connection
+            _SHARED_HTTP_CLIENT = httpx.AsyncClient(
+                proxy=None,  # Explicitly disable proxy
+                trust_env=False,  # Don't use environment proxy settings
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+            _SHARED_LLM_CLIENT = AsyncOpenAI(
+                api_key=_API_KEY,
+                base_url=_BASE_URL,
+                http_client=_SHARED_HTTP_CLIENT,
+                max_retries=0  # Retries are handled in TextAgent._call_llm_api
+            )
+        return _SHARED_LLM_CLIENT
+
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore capping in-flight LLM calls, created inside the running loop."""
+    global _LLM_SEMAPHORE
+    if _LLM_SEMAPHORE is None:
+        _LLM_SEMAPHORE = asyncio.Semaphore(_LLM_CONCURRENCY)
+    return _LLM_SEMAPHORE
+
+
+async def close_shared_clients() -> None:
+    """Close the shared LLM connection pool; call once at shutdown."""
+    global _SHARED_HTTP_CLIENT, _SHARED_LLM_CLIENT, _LLM_SEMAPHORE
+    with _SHARED_CLIENTS_LOCK:
+        http_client = _SHARED_HTTP_CLIENT
+        _SHARED_HTTP_CLIENT = None
+        _SHARED_LLM_CLIENT = None
+        # The semaphore is bound to the loop it was first used in; a later
+        # asyncio.run() must get a fresh one
+        _LLM_SEMAPHORE = None
+    if http_client is not None:
+        await http_client.aclose()
+
+
+_LLM_MODEL = "claude-sonnet-4-20250514"
+# Response cache, opt-in with WEBWORLD_LLM_CACHE=1. A cached answer only stands in
+# for a fresh one under greedy decoding, so enabling it also sets temperature 0;
+# otherwise repeated runs would replay one random sample and lose their variance.
+_LLM_CACHE_ENABLED = os.getenv("WEBWORLD_LLM_CACHE", "0") == "1"
+_LLM_TEMPERATURE = 0.0 if _LLM_CACHE_ENABLED else 0.7
+_LLM_CACHE = (
+    _LLMCache(
+        Path.home() / ".cache" / "webworld-llm",
+        max_disk_entries=int(os.getenv("WEBWORLD_LLM_CACHE_MAX_FILES", "10000"))
+    )
+    if _LLM_CACHE_ENABLED
+    else None
+)
 
 
 class TextAgent(BaseAgent):
@@ -35,31 +339,30 @@ class TextAgent(BaseAgent):
         # Text extraction preferences
         self.observation_type = self.config.get("observation_type", "accessibility_tree")
         self.current_viewport_only = self.config.get("current_viewport_only", True)
-
-
-
-        # API configuration from environment
-        from dotenv import load_dotenv
-        # 加载 .env 文件
-        load_dotenv()
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.base_url = os.getenv("OPENAI_API_BASE_URL", "https://api.openai.com/v1")
-        
-        # Configure HTTP client to bypass proxy for direct connection
-        import httpx
-        http_client = httpx.Client(
-            proxy=None,  # Explicitly disable proxy
-            trust_env=False  # Don't use environment proxy settings
-        )
-        
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-            http_client=http_client
-        )
-
-        # History tracking
-        self.action_history: List[str] = []
+        # Set to False to send the unpruned accessibility tree (useful for debugging)
+        self.prune_axtree = self.config.get("prune_axtree", True)
+        # Stream LLM responses and stop reading once the action line is complete
+        self.stream_llm = self.config.get("stream_llm", True)
+        # Keyword-matching fallback used when the LLM call fails (low quality, off by default)
+        self.enable_simple_fallback = self.config.get("enable_simple_fallback", False)
+        # Scroll down without calling the LLM when the page text stops changing
+        self.same_page_scroll = self.config.get("same_page_scroll", True)
+
+        # API configuration (loaded once at module import; the client is shared)
+        self.api_key = _API_KEY
+        self.base_url = _BASE_URL
+
+        # Text info of the last extraction and the page version it was taken at
+        self._text_info_version: Optional[tuple] = None
+        self._text_info_cache: Optional[str] = None
+
+        # Hash of the last page text and how many steps in a row it came back unchanged
+        self._last_text_info_hash: Optional[bytes] = None
+        self._same_page_streak = 0
+
+        # History tracking as (step, thought, action); the deque drops the oldest
+        # entries, keeping the last 10 responses, and the prompt text is built on demand
+        self.action_history: Deque[Tuple[int, str, str]] = deque(maxlen=10)
         self.step_count = 0
 
         # WebEnvironment reference (set by evaluation framework)
@@ -68,9 +371,19 @@ class TextAgent(BaseAgent):
 
         logger.info(f"TextAgent initialized with observation_type: {self.observation_type}")
 
+    async def reset(self) -> None:
+        """Reset agent state, dropping the cached page text."""
+        await super().reset()
+        self._text_info_version = None
+        self._text_info_cache = None
+        self._last_text_info_hash = None
+        self._same_page_streak = 0
+
     def set_web_environment(self, web_env):
         """Set the WebEnvironment instance for text extraction."""
         self.web_environment = web_env
+        self._text_info_version = None
+        # Kept for debugging; the environment scales element centers by the same factor
         self.device_scale_factor = web_env.browser_config.get("device_scale_factor", 1.0)
         logger.debug(f"Device scale factor set to: {self.device_scale_factor}")
         logger.info("WebEnvironment reference set for TextAgent")
@@ -89,10 +402,23 @@ class TextAgent(BaseAgent):
         try:
             logger.info(f"TextAgent processing task: {task_description}...")
             
-            # Extract text information from the current page
-            # Note: This requires access to the WebEnvironment instance
-            # In a real implementation, this would be passed through the evaluation framework
-            text_info = await self._extract_page_text_info()
+            if not self.web_environment:
+                logger.error("WebEnvironment not set - cannot extract text information")
+                text_info, current_selected_data = None, None
+            else:
+                # Extract text information and the selected form values from the
+                # current page concurrently; the two browser calls are independent
+                text_info, current_selected_data = await asyncio.gather(
+                    self._extract_page_text_info(),
+                    self.web_environment.execute_javascript("getSelectedValues()"),
+                    return_exceptions=True
+                )
+                if isinstance(text_info, BaseException):
+                    logger.error(f"Failed to extract page text info: {text_info}")
+                    text_info = None
+                if isinstance(current_selected_data, BaseException):
+                    logger.error(f"Failed to get selected values: {current_selected_data}")
+                    current_selected_data = None
             
             if not text_info:
                 logger.warning("No text information available, falling back to basic response")
@@ -104,11 +430,16 @@ class TextAgent(BaseAgent):
                     error_message="Failed to extract page text information"
                 )
             
-            # Process text information and generate actions
-            actions, reasoning, task_complete = await self._process_text_and_generate_actions(text_info, task_description)
+            # Skip the LLM when the last actions kept leaving the page exactly as it was
+            if self.same_page_scroll:
+                stuck_response = self._check_same_page(text_info)
+                if stuck_response is not None:
+                    return stuck_response
 
-            # Update history
-            self._update_history()
+            # Process text information and generate actions
+            actions, reasoning, task_complete = await self._process_text_and_generate_actions(
+                text_info, task_description, current_selected_data
+            )
             
             return AgentResponse(
                 actions=actions,
@@ -127,6 +458,41 @@ class TextAgent(BaseAgent):
                 error_message=str(e)
             )
 
+    def _check_same_page(self, text_info: str) -> Optional[AgentResponse]:
+        """
+        Track repeated page text and, when stuck, return a scroll without asking the LLM.
+
+        Once the page text has come back identical _SAME_PAGE_STREAK_LIMIT times in a
+        row, the previous actions are not making progress and another LLM round trip
+        on the same input is likely to repeat them. A scroll down is returned instead
+        and the streak restarts, so the LLM is consulted again on the next step.
+        """
+        text_hash = hashlib.blake2b(text_info.encode("utf-8"), digest_size=8).digest()
+        if text_hash != self._last_text_info_hash:
+            self._last_text_info_hash = text_hash
+            self._same_page_streak = 0
+            return None
+
+        self._same_page_streak += 1
+        if self._same_page_streak < _SAME_PAGE_STREAK_LIMIT:
+            return None
+
+        self._same_page_streak = 0
+        logger.info(f"Page unchanged for {_SAME_PAGE_STREAK_LIMIT} steps, scrolling down without calling the LLM")
+        self.step_count += 1
+        thought = "The page has not changed after the previous actions; scrolling to reveal more content."
+        self.action_history.append((self.step_count, thought, "scroll down"))
+        return AgentResponse(
+            actions=[ActionCommand(
+                action_type="scroll",
+                parameters={"dx": 0, "dy": _DISTANCE_MAP["large"], "direction": "down", "amount": 0},
+                description="Scroll down (page unchanged)",
+            )],
+            reasoning=thought,
+            task_complete=False,
+            needs_more_info=False
+        )
+
     async def _extract_page_text_info(self) -> Optional[str]:
         """
         Extract text information from the current page using WebEnvironment.
@@ -136,6 +502,16 @@ class TextAgent(BaseAgent):
             return None
 
         try:
+            # Reuse the previous extraction while the page has not changed
+            try:
+                version = tuple(await self.web_environment.page.evaluate(_PAGE_VERSION_JS))
+            except Exception as e:
+                logger.debug(f"Could not read page version, extracting anyway: {e}")
+                version = None
+            if version is not None and version == self._text_info_version:
+                logger.debug("Page unchanged since last extraction, reusing text information")
+                return self._text_info_cache
+
             # Extract text information using the WebEnvironment's text extraction capabilities
             text_info = await self.web_environment.get_page_text_info(
                 observation_type=self.observation_type,
@@ -143,6 +519,12 @@ class TextAgent(BaseAgent):
             )
 
             logger.debug(f"Extracted {len(text_info)} characters of text information")
+            if self.prune_axtree and self.observation_type == "accessibility_tree":
+                # Pruning walks the whole tree; keep it off the event loop
+                text_info = await asyncio.to_thread(_prune_axtree, text_info)
+            if text_info:
+                self._text_info_version = version
+                self._text_info_cache = text_info
             return text_info
 
         except Exception as e:
@@ -152,7 +534,8 @@ class TextAgent(BaseAgent):
     async def _process_text_and_generate_actions(
         self,
         text_info: str,
-        task_description: str
+        task_description: str,
+        current_selected_data: Any = None
     ) -> Tuple[List[ActionCommand], str, bool]:
         """
         Process text information and generate appropriate actions using LLM/prompt-based approach.
@@ -160,6 +543,7 @@ class TextAgent(BaseAgent):
         Args:
             text_info: Text representation of the page (DOM or accessibility tree)
             task_description: Task to complete
+            current_selected_data: Result of getSelectedValues() on the current page
 
         Returns:
             Tuple of (actions, reasoning, task_complete)
@@ -170,12 +554,16 @@ class TextAgent(BaseAgent):
 
         try:
             # Construct messages for LLM conversation using the prompt template
-            messages = await self._construct_llm_messages(text_info, task_description)
+            messages = await self._construct_llm_messages(text_info, task_description, current_selected_data)
 
             # Get LLM response
             llm_response = await self._call_llm_api(messages)
 
             if not llm_response:
+                if not self.enable_simple_fallback:
+                    logger.warning("No LLM response received")
+                    reasoning = "LLM API unavailable, no action generated"
+                    return actions, reasoning, task_complete
                 logger.warning("No LLM response received, falling back to simple action")
                 action = await self._generate_simple_action(text_info, task_description)
                 if action:
@@ -189,8 +577,7 @@ class TextAgent(BaseAgent):
             logger.debug(f"\nLLM Response:\n{llm_response}")
             # Record the full LLM response in history
             self.step_count += 1
-            full_response = f"Step {self.step_count}:\nThought: {thought}\nAction: {action_text}"
-            self.action_history.append(full_response)
+            self.action_history.append((self.step_count, thought, action_text))
 
             # Check if task is complete (stop action)
             if action_text.startswith("stop"):
@@ -205,11 +592,14 @@ class TextAgent(BaseAgent):
 
         except Exception as e:
             logger.error(f"Failed to process text and generate actions: {e}")
-            # Fallback to simple action generation
-            action = await self._generate_simple_action(text_info, task_description)
-            if action:
-                actions.append(action)
-            reasoning = f"Error in LLM processing: {str(e)}, used fallback"
+            if self.enable_simple_fallback:
+                # Fallback to simple action generation
+                action = await self._generate_simple_action(text_info, task_description)
+                if action:
+                    actions.append(action)
+                reasoning = f"Error in LLM processing: {str(e)}, used fallback"
+            else:
+                reasoning = f"Error in LLM processing: {str(e)}"
 
         return actions, reasoning, task_complete
 
@@ -222,8 +612,8 @@ class TextAgent(BaseAgent):
         # 简单的关键词匹配
         if "click" in task_lower and "button" in task_lower:
             # 在文本中查找button
-            import re
-            button_match = re.search(r'\[(\d+)\]\s+button\s+[\'"]([^\'"]*)[\'"]', text_info)
+            # 整棵树的正则扫描放到线程中，避免阻塞事件循环
+            button_match = await asyncio.to_thread(_BUTTON_RE.search, text_info)
             if button_match:
                 element_id = button_match.group(1)
                 button_name = button_match.group(2)
@@ -241,33 +631,36 @@ class TextAgent(BaseAgent):
 
         return None
 
-    async def _construct_llm_messages(self, text_info: str, task_description: str) -> List[Dict[str, Any]]:
+    async def _construct_llm_messages(
+        self,
+        text_info: str,
+        task_description: str,
+        current_selected_data: Any = None
+    ) -> List[Dict[str, Any]]:
         """
         Construct messages array for LLM conversation using the CoT prompt template.
 
         Args:
             text_info: Text representation of the page
             task_description: Task to complete
+            current_selected_data: Selected form values fetched alongside text_info
 
         Returns:
             List of messages in chat completion format
         """
-        # Import the prompt template
-        from .prompts.text_agent_prompts import TEXT_AGENT_COT_PROMPT
-
-        # Use the system prompt from the template
-        system_prompt = TEXT_AGENT_COT_PROMPT["intro"]
+        # Use the system prompt from the template. It is kept byte-identical across
+        # steps (nothing per-step goes into it) so the API server can reuse its
+        # cached prefix computation; all per-step data lives in the user message.
+        system_prompt = TEXT_AGENT_COT_PROMPT.intro
 
         # Construct current observation using the template format
         previous_action = "None"
         if self.action_history:
-            # 使用最近的10条历史记录,用换行符连接
-            previous_action = "\n".join(self.action_history[-10:])
-
-        current_selected_data = await self.web_environment.execute_javascript("getSelectedValues()")
+            # 使用最近的10条历史记录,用换行符连接（连续重复的步骤只保留一条）
+            previous_action = _compress_history(self.action_history)
 
         # Format the user message according to the template
-        user_message = TEXT_AGENT_COT_PROMPT["template"].format(
+        user_message = render_cot_template(
             accessibility_tree=text_info,
             objective=task_description,
             previous_action=previous_action,
@@ -289,31 +682,110 @@ class TextAgent(BaseAgent):
 
         Returns:
             LLM response content or None if failed
+
+        Raises:
+            Transient API errors (timeouts, connection errors, rate limits, 5xx)
+            are retried with exponential backoff and re-raised after the last attempt
         """
         if not self.api_key:
             logger.error("API key not found. Please set OPENAI_API_KEY environment variable.")
             return None
 
-        try:
-            logger.debug(f"Calling LLM API: {self.base_url}")
-            response = self.client.chat.completions.create(
-                model="claude-sonnet-4-20250514",
-                # model="gpt-4o-mini",
-                messages=messages,
-                temperature=0.7
+        cache_key = None
+        if _LLM_CACHE is not None:
+            cache_key = _LLMCache.make_key(
+                _LLM_MODEL, _LLM_TEMPERATURE, messages[0]["content"], messages[1]["content"]
             )
-            content = response.choices[0].message.content
-            logger.info("LLM API call successful")
-            return content
+            cached = await _LLM_CACHE.get(cache_key)
+            if cached is not None:
+                logger.info("LLM response served from cache")
+                return cached
 
+        client = _get_shared_llm_client()
+        try:
+            for attempt in range(_LLM_MAX_ATTEMPTS):
+                try:
+                    logger.debug(f"Calling LLM API: {self.base_url}")
+                    # Hold a slot only while the request is in flight, not during backoff
+                    async with _get_llm_semaphore():
+                        content = await asyncio.wait_for(
+                            self._request_completion(client, messages),
+                            timeout=_LLM_CALL_TIMEOUT
+                        )
+                    break
+                except _RETRYABLE_LLM_ERRORS as e:
+                    if attempt == _LLM_MAX_ATTEMPTS - 1:
+                        logger.error(f"LLM API call failed after {_LLM_MAX_ATTEMPTS} attempts: {e!r}")
+                        raise
+                    delay = _LLM_RETRY_BASE_DELAY * 2 ** attempt
+                    logger.warning(f"LLM API call failed ({e!r}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+        except _RETRYABLE_LLM_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Error calling LLM API: {e}")
             return None
 
+        logger.info("LLM API call successful")
+        if cache_key is not None and content:
+            await _LLM_CACHE.set(cache_key, content)
+        return content
+
+    async def _request_completion(self, client: AsyncOpenAI, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Request one chat completion and return its text.
+
+        When streaming is enabled the stream is closed as soon as a complete line
+        starting with "Action: <verb>" has arrived. The prompt asks for a single
+        action, so that label is normally the last one, which is the one
+        _parse_llm_response reads. An "Action:" mentioned mid-line inside the
+        thought does not end the stream.
+        """
+        if not self.stream_llm:
+            response = await client.chat.completions.create(
+                model=_LLM_MODEL,
+                # model="gpt-4o-mini",
+                messages=messages,
+                temperature=_LLM_TEMPERATURE
+            )
+            return response.choices[0].message.content
+
+        stream = await client.chat.completions.create(
+            model=_LLM_MODEL,
+            messages=messages,
+            temperature=_LLM_TEMPERATURE,
+            stream=True
+        )
+        content = ""
+        # Start of the last complete line; the action line can only begin there or later
+        scan_from = 0
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                content += delta
+                if "\n" in delta:
+                    if _STREAM_ACTION_RE.search(content, scan_from):
+                        logger.debug("Complete action line received, closing LLM stream early")
+                        break
+                    last_newline = content.rfind("\n")
+                    scan_from = content.rfind("\n", 0, last_newline) + 1
+        finally:
+            await stream.close()
+        return content
+
     def _parse_llm_response(self, response: str) -> Tuple[str, str]:
         """
         Parse LLM response to extract thought and action with robust code block and parameter handling.
 
+        Only the first ``` fenced block is considered when one is present. The
+        action is read after the last "Action:" label, wherever it appears: the
+        first following line that starts with an action verb, else the first line.
+
         Args:
             response: Raw LLM response
 
@@ -326,61 +798,41 @@ class TextAgent(BaseAgent):
         try:
             response = response.strip()
 
-            # Step 1: Extract content from code blocks if present
-            # The thought and action are only a small portion wrapped in ```
-            if "```" in response:
-                # Find the first occurrence of ``` and extract content until the closing ```
-                start_idx = response.find("```")
-                if start_idx != -1:
-                    # Look for content after the opening ```
-                    content_start = start_idx + 3
-
-                    # Skip language identifier line if present
-                    remaining = response[content_start:].strip()
-                    if remaining and not remaining.startswith(("Thought:", "Action:")):
-                        # Check if first line is a language identifier
-                        first_line_end = remaining.find('\n')
-                        if first_line_end != -1:
-                            first_line = remaining[:first_line_end].strip()
-                            # If first line doesn't contain Thought: or Action:, skip it
-                            if not any(keyword in first_line for keyword in ["Thought:", "Action:"]):
-                                remaining = remaining[first_line_end + 1:].strip()
-
-                    # Find the closing ```
-                    end_idx = remaining.find("```")
-                    if end_idx != -1:
-                        response = remaining[:end_idx].strip()
-                    else:
-                        response = remaining
-                else:
-                    # No opening ``` found, use original response
-                    pass
+            # Step 1: Only the first ``` fenced block is used when one is present;
+            # the thought and action are only a small portion wrapped in ```
+            start_idx = response.find("```")
+            if start_idx != -1:
+                remaining = response[start_idx + 3:].strip()
+                # Skip a language identifier line unless it already holds a label
+                if remaining and not remaining.startswith(("Thought:", "Action:")):
+                    first_line, newline, rest = remaining.partition("\n")
+                    if newline and "Thought:" not in first_line and "Action:" not in first_line:
+                        remaining = rest.strip()
+                end_idx = remaining.find("```")
+                response = remaining[:end_idx].strip() if end_idx != -1 else remaining
 
             # Step 2: Extract thought
-            thought_pattern = r"Thought:\s*(.*?)(?=\s*Action:|$)"
-            thought_match = re.search(thought_pattern, response, re.DOTALL | re.IGNORECASE)
+            thought_match = _THOUGHT_RE.search(response)
             if thought_match:
                 thought = thought_match.group(1).strip()
 
-            # Step 3: Extract action
-            if "Action:" in response:
-                action_text = response.split("Action:")[-1].strip()
+            # Step 3: The action follows the LAST "Action:" label, wherever it appears
+            # (not necessarily at the start of a line)
+            _, action_label, action_block = response.rpartition("Action:")
+            if action_label:
+                action_block = action_block.strip()
 
                 # Clean up action text - take the first valid action line
-                action_lines = action_text.split('\n')
-                clean_action = ""
-
-                for line in action_lines:
+                for line in action_block.split("\n"):
                     line = line.strip()
-                    if line and not line.startswith('#') and not line.startswith('```'):
-                        # Look for valid action patterns
-                        if line.startswith(('click', 'type', 'scroll', 'stop', 'drag')):
-                            clean_action = line
-                            break
-                    elif line.startswith('```'):
+                    if line.startswith(_ACTION_VERB_PREFIXES):
+                        action_text = line
+                        break
+                    if line.startswith("```"):
                         break  # Stop at code block end
 
-                action_text = clean_action if clean_action else action_text.split('\n')[0].strip()
+                if not action_text:
+                    action_text = action_block.split("\n", 1)[0].strip()
             else:
                 logger.warning("No 'Action:' found in response")
                 action_text = "retrying for llm response"
@@ -421,11 +873,22 @@ class TextAgent(BaseAgent):
                     return param_str[1:-1]
                 return param_str
 
+            click_match = _CLICK_RE.search(action_text)
+            type_match = _TYPE_RE.search(action_text)
+            scroll_match = _SCROLL_RE.search(action_text)
+
+            # Resolve every referenced element in a single lookup before building actions
+            element_ids = {
+                strip_brackets(match.group(1))
+                for match in (click_match, type_match, scroll_match)
+                if match
+            }
+            coordinates_by_id = await self._get_elements_coordinates(element_ids)
+
             # Parse click actions: click [id] or click id
-            click_match = re.search(r'click\s+(\[?\d+\]?)', action_text)
             if click_match:
                 element_id = strip_brackets(click_match.group(1))
-                coordinates = await self._get_element_coordinates(element_id)
+                coordinates = coordinates_by_id.get(element_id)
                 if coordinates:
                     x, y = coordinates
                     actions.append(ActionCommand(
@@ -438,13 +901,12 @@ class TextAgent(BaseAgent):
                 return actions
 
             # Parse type actions: type [id] [content] or type id content
-            type_match = re.search(r'type\s+(\[?\d+\]?)\s+(.+)', action_text)
             if type_match:
                 element_id = strip_brackets(type_match.group(1))
                 content = type_match.group(2).strip()
                 # Remove brackets from content if present
                 content = strip_brackets(content)
-                coordinates = await self._get_element_coordinates(element_id)
+                coordinates = coordinates_by_id.get(element_id)
                 if coordinates:
                     x, y = coordinates
                     actions.append(ActionCommand(
@@ -460,7 +922,6 @@ class TextAgent(BaseAgent):
             # 1. Standard: scroll [213] [direction=left] [distance=medium]
             # 2. Simplified: scroll [213] left medium
             # 3. Mixed: scroll 213 direction=left distance=medium
-            scroll_match = re.search(r'scroll\s+(\[?\d+\]?)\s+(.+)', action_text)
             if scroll_match:
                 element_id = strip_brackets(scroll_match.group(1))
                 params_text = scroll_match.group(2).strip()
@@ -471,11 +932,11 @@ class TextAgent(BaseAgent):
 
                 # Try to extract direction and distance using multiple patterns
                 # Pattern 1: [direction=value] [distance=value] format
-                dir_match = re.search(r'\[?direction=(\w+)\]?', params_text)
+                dir_match = _DIR_RE.search(params_text)
                 if dir_match:
                     direction = strip_brackets(dir_match.group(1))
 
-                dist_match = re.search(r'\[?distance=(\w+)\]?', params_text)
+                dist_match = _DIST_RE.search(params_text)
                 if dist_match:
                     distance = strip_brackets(dist_match.group(1))
 
@@ -486,34 +947,20 @@ class TextAgent(BaseAgent):
                     clean_params = [strip_brackets(p) for p in params]
 
                     # Look for direction keywords
-                    direction_keywords = ['up', 'down', 'left', 'right']
-                    distance_keywords = ['small', 'medium', 'large', 'xlarge']
-
                     for param in clean_params:
-                        if param in direction_keywords:
+                        if param in _DIRECTION_KEYWORDS:
                             direction = param
-                        elif param in distance_keywords:
+                        elif param in _DISTANCE_KEYWORDS:
                             distance = param
 
-                coordinates = await self._get_element_coordinates(element_id)
+                coordinates = coordinates_by_id.get(element_id)
                 if coordinates:
                     x, y = coordinates
 
-                    # Convert distance to pixel values
-                    distance_map = {
-                        "small": 33,
-                        "medium": 100,
-                        "large": 300,
-                        "xlarge": 900
-                    }
-                    scroll_pixels = distance_map.get(distance, 300)  # default to medium
-
-                    # Convert direction to scroll distance
-                    dx, dy = 0, 0
-                    if direction == "down" or direction == "up":
-                        dy = scroll_pixels
-                    elif direction == "left" or direction == "right":
-                        dx = scroll_pixels
+                    # Convert distance to pixel values and direction to scroll distance
+                    scroll_pixels = _DISTANCE_MAP.get(distance, 300)
+                    x_axis, y_axis = _SCROLL_AXIS.get(direction, (0, 0))
+                    dx, dy = x_axis * scroll_pixels, y_axis * scroll_pixels
 
                     actions.append(ActionCommand(
                         action_type="scroll",
@@ -541,34 +988,32 @@ class TextAgent(BaseAgent):
         Returns:
             Tuple of (x, y) coordinates or None if not found
         """
+        coordinates = await self._get_elements_coordinates([element_id])
+        return coordinates.get(element_id)
+
+    async def _get_elements_coordinates(self, element_ids: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """
+        Get screen coordinates for several elements with a single WebEnvironment lookup.
+
+        Args:
+            element_ids: Element IDs from accessibility tree
+
+        Returns:
+            Dict mapping each element ID that was found to its (x, y) coordinates
+        """
         if not self.web_environment:
             logger.error("WebEnvironment not available for coordinate mapping")
-            return None
+            return {}
+        if not element_ids:
+            return {}
 
         try:
-            # Get element center as viewport ratios
-            center_ratios = await self.web_environment.get_element_center(element_id)
-            if not center_ratios:
-                return None
-
-            # Convert ratios to screen coordinates
-            # Get viewport size
-            viewport = await self.web_environment.page.evaluate(
-                "() => ({ width: window.innerWidth, height: window.innerHeight })"
-            )
-
-            x = int(center_ratios[0] * viewport["width"] * self.device_scale_factor)
-            y = int(center_ratios[1] * viewport["height"] * self.device_scale_factor)
-
-            logger.debug(f"Element {element_id} coordinates: ({x}, {y})")
-            return (x, y)
+            # Element centers already scaled to screen pixels by device_scale_factor
+            coordinates = await self.web_environment.get_elements_screen_points(list(element_ids))
+            for element_id, (x, y) in coordinates.items():
+                logger.debug(f"Element {element_id} coordinates: ({x}, {y})")
+            return coordinates
 
         except Exception as e:
-            logger.error(f"Failed to get coordinates for element {element_id}: {e}")
-            return None
-
-    def _update_history(self) -> None:
-        """Update action history management."""
-        # Keep history manageable - limit to last 10 full responses
-        if len(self.action_history) > 10:
-            self.action_history = self.action_history[-10:]
+            logger.error(f"Failed to get coordinates for elements {list(element_ids)}: {e}")
+            return {}
@@ -8,15 +8,97 @@ before taking actions. This agent is adapted to work with our evaluation framewo
 import asyncio
 import ast
 import base64
+import functools
+import hashlib
 import json
 import re
+import time
+from collections import OrderedDict, deque
 from io import BytesIO
-from typing import Dict, Any, List, Optional, Tuple
+from itertools import islice
+from typing import Deque, Dict, Any, List, Optional, Tuple
 from PIL import Image
 from loguru import logger
 
 from .base_agent import BaseAgent, AgentResponse, ActionCommand
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# SIMD base64 when installed; same API as the stdlib module
+try:
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
+
+# WebP screenshots are several times smaller and cheaper to encode than PNG;
+# JPEG is used instead when Pillow was built without WebP support
+_WEBP_AVAILABLE = ".webp" in Image.registered_extensions()
+
+# Cheap pre-check so strings that cannot be a call never reach ast.parse
+_ACTION_RE = re.compile(r"^\s*([A-Za-z_][\w.]*)\s*\(")
+# Unescaped single quote (not preceded by a backslash)
+_QUOTE_RE = re.compile(r"(?<!\\)'")
+
+# Thought/reflection patterns for _parse_llm_response, chosen by response prefix
+_THOUGHT_RE = re.compile(r"Thought:\s*(.*?)(?=\s*Action:|$)", re.DOTALL | re.IGNORECASE)
+_REFLECTION_RE = re.compile(r"Reflection:\s*(.*?)Action_Summary:\s*(.*?)(?=\s*Action:|$)", re.DOTALL | re.IGNORECASE)
+_ACTION_SUMMARY_RE = re.compile(r"Action_Summary:\s*(.*?)(?=\s*Action:|$)", re.DOTALL | re.IGNORECASE)
+_TYPE_CONTENT_RE = re.compile(r"type\(content='(.*?)'\)")
+
+# Regex fallback patterns for the _parse_*_action methods. Each action's accepted
+# formats are alternatives of one pattern, so the text is scanned once; the named
+# groups that matched tell which format it was.
+_CLICK_RE = re.compile(
+    r'click\((?:(?P<x>\d+),\s*(?P<y>\d+)'  # click(x, y)
+    r'|start_box=[\'"]?\([\'"]?(?P<bx>\d+),\s*(?P<by>\d+)[\'"]?\)[\'"]?)\)'  # click(start_box='(x,y)')
+)
+_DRAG_RE = re.compile(
+    r'drag\((?:(?P<sx>\d+),\s*(?P<sy>\d+),\s*(?P<ex>\d+),\s*(?P<ey>\d+)'  # drag(x1, y1, x2, y2)
+    r'|start_box=[\'"]?\([\'"]?(?P<bsx>\d+),\s*(?P<bsy>\d+)[\'"]?\)[\'"]?,'  # drag(start_box='(x1,y1)',
+    r'\s*end_box=[\'"]?\([\'"]?(?P<bex>\d+),\s*(?P<bey>\d+)[\'"]?\)[\'"]?)\)'  # end_box='(x2,y2)')
+)
+_TYPE_RE = re.compile(
+    r'type\((?:content=[\'"](?P<content>[^\'"]*)[\'"]'  # type(content='text')
+    r'|(?P<raw>[^)]+)\))'  # type(text)
+)
+_SCROLL_RE = re.compile(
+    r'scroll\((?:x=(?P<cx>\d+),\s*y=(?P<cy>\d+),\s*direction=[\'"](?P<cd>[^\'"]+)[\'"]'  # scroll(x=.., y=.., direction='..')
+    r'|(?P<tx>\d+),\s*(?P<ty>\d+),\s*[\'"]?(?P<td>[^\'")\s]+)[\'"]?\)'  # scroll(x, y, direction)
+    r'|start_box=[\'"]?\([\'"]?(?P<ux>\d+),\s*(?P<uy>\d+)[\'"]?\)[\'"]?,'  # scroll(start_box='(x,y)',
+    r'\s*direction=[\'"](?P<ud>[^\'"]+)[\'"]'  # direction='..')
+    r'|(?P<d>[^)]+)\))'  # scroll(direction)
+)
+
+# Escape sequences decoded in typed text, in a single pass
+_UNESCAPE_RE = re.compile(r"\\([n\"'])")
+_UNESCAPE_MAP = {"n": "\n", '"': '"', "'": "'"}
+
+# Scroll directions understood by the framework
+_SCROLL_DIRECTIONS = frozenset(("down", "up", "left", "right"))
+
+# Completion actions; they end the task instead of producing an ActionCommand
+_FINISH_FUNCTIONS = frozenset({"finish", "finished"})
+# Numbers inside a coordinate box, ignoring parentheses and <|box_start|> tokens
+_NUM_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+# LLM responses for byte-identical requests, shared by all agents in the process:
+# key -> (monotonic insert time, response). LRU order, see UITARSAgent._cache_get.
+_RESPONSE_CACHE: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+_RESPONSE_CACHE_MAX_ENTRIES = 256
+
+
+def _dumps_payload(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request payload to JSON bytes, using orjson when it is installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
 
 def parse_action_ast(action_str: str) -> Optional[Dict[str, Any]]:
     """
@@ -29,10 +111,160 @@ def parse_action_ast(action_str: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dict with 'function' and 'args' keys, or None if parsing fails
     """
-    try:
-        # Clean up the action string
-        action_str = action_str.strip()
+    # Clean up the action string
+    action_str = action_str.strip()
+    if not _ACTION_RE.match(action_str):
+        logger.warning(f"AST parsing failed for '{action_str}': Not a function call")
+        return None
+
+    parsed = _parse_action_ast_cached(action_str)
+    if parsed is None:
+        return None
+
+    # Build a fresh dict each time so callers may mutate the result
+    func_name, kwargs, args = parsed
+    return {
+        'function': func_name,
+        'args': dict(kwargs),
+        'positional_args': list(args)
+    }
 
+
+# Escapes understood by _fast_parse_action; any other escape falls back to ast
+_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", "'": "'", '"': '"'}
+
+
+def _skip_spaces(text: str, i: int) -> int:
+    """Return the index of the next non-space character at or after i."""
+    while i < len(text) and text[i] in " \t":
+        i += 1
+    return i
+
+
+def _parse_literal(text: str, i: int) -> Tuple[Any, Optional[int]]:
+    """
+    Parse a quoted string or non-negative integer literal starting at text[i].
+
+    Returns:
+        (value, end index), or (None, None) if the literal is not one of the
+        simple forms handled here
+    """
+    if i >= len(text):
+        return None, None
+
+    quote = text[i]
+    if quote in "'\"":
+        chars = []
+        i += 1
+        while i < len(text):
+            char = text[i]
+            if char == quote:
+                return "".join(chars), i + 1
+            if char == "\n":
+                return None, None
+            if char == "\\":
+                escaped = _SIMPLE_ESCAPES.get(text[i + 1:i + 2])
+                if escaped is None:
+                    return None, None
+                chars.append(escaped)
+                i += 2
+                continue
+            chars.append(char)
+            i += 1
+        return None, None  # Unterminated string
+
+    end = i
+    while end < len(text) and text[end].isdigit():
+        end += 1
+    if end == i or (end - i > 1 and text[i] == "0"):
+        return None, None
+    if end < len(text) and (text[end].isalnum() or text[end] in "._"):
+        return None, None  # Float, hex or other numeric form
+    return int(text[i:end]), end
+
+
+def _fast_parse_action(action_str: str) -> Optional[Tuple[str, Tuple, Tuple]]:
+    """
+    Parse a stripped action call without going through the Python parser.
+
+    Handles the action grammar the model actually emits: name(arg, key=value, ...)
+    with quoted string and integer values. Returns the same tuple as
+    _parse_action_ast_cached, or None for anything else so the caller can fall
+    back to ast.
+    """
+    n = len(action_str)
+
+    # Function name; dotted names keep their last part, like ast.Attribute
+    i = 0
+    while i < n and (action_str[i].isalnum() or action_str[i] in "_."):
+        i += 1
+    name_parts = action_str[:i].split(".")
+    if not all(part.isidentifier() for part in name_parts):
+        return None
+    func_name = name_parts[-1]
+    i = _skip_spaces(action_str, i)
+    if i >= n or action_str[i] != "(":
+        return None
+    i += 1
+
+    kwargs = {}
+    args = []
+    while True:
+        i = _skip_spaces(action_str, i)
+        if i >= n:
+            return None
+        if action_str[i] == ")":
+            i += 1
+            break
+
+        # Optional "key=" before the value
+        key = None
+        j = i
+        while j < n and (action_str[j].isalnum() or action_str[j] == "_"):
+            j += 1
+        if j > i and not action_str[i].isdigit():
+            k = _skip_spaces(action_str, j)
+            if k < n and action_str[k] == "=":
+                key = action_str[i:j]
+                i = _skip_spaces(action_str, k + 1)
+
+        value, i = _parse_literal(action_str, i)
+        if i is None:
+            return None
+        if key is None:
+            if kwargs:
+                return None  # Positional after keyword argument
+            args.append(value)
+        elif key in kwargs:
+            return None  # Repeated keyword argument
+        else:
+            kwargs[key] = value
+
+        i = _skip_spaces(action_str, i)
+        if i < n and action_str[i] == ",":
+            i += 1
+        elif i >= n or action_str[i] != ")":
+            return None
+
+    if i != n:
+        return None
+    return func_name, tuple(kwargs.items()), tuple(args)
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_action_ast_cached(action_str: str) -> Optional[Tuple[Optional[str], Tuple, Tuple]]:
+    """
+    Memoized AST parse of a stripped action string.
+
+    The action space is small and LLM outputs repeat often (wait(), identical
+    clicks), so most calls are served from the cache. Returns an immutable
+    (function, kwargs items, positional args) tuple, or None if parsing fails.
+    """
+    parsed = _fast_parse_action(action_str)
+    if parsed is not None:
+        return parsed
+
+    try:
         # Parse string as AST node
         node = ast.parse(action_str, mode='eval')
 
@@ -78,11 +310,7 @@ def parse_action_ast(action_str: str) -> Optional[Dict[str, Any]]:
             elif isinstance(arg, ast.Str):  # Compatibility with older Python
                 args.append(arg.s)
 
-        return {
-            'function': func_name,
-            'args': kwargs,
-            'positional_args': args
-        }
+        return func_name, tuple(kwargs.items()), tuple(args)
 
     except Exception as e:
         logger.warning(f"AST parsing failed for '{action_str}': {e}")
@@ -92,8 +320,7 @@ def parse_action_ast(action_str: str) -> Optional[Dict[str, Any]]:
 def escape_single_quotes(text: str) -> str:
     """Escape unescaped single quotes in text."""
     # Match unescaped single quotes (not matching \\')
-    pattern = r"(?<!\\)'"
-    return re.sub(pattern, r"\\'", text)
+    return _QUOTE_RE.sub(r"\\'", text)
 
 
 class UITARSAgent(BaseAgent):
@@ -123,12 +350,52 @@ class UITARSAgent(BaseAgent):
         self.model_name = self.llm_config.get("model", "ui-tars")
         self.temperature = self.llm_config.get("temperature", 0.7)
         self.max_tokens = self.llm_config.get("max_tokens", 512)
+        # Reuse responses for identical requests; only safe when sampling is deterministic
+        self.cacheable = self.llm_config.get("cacheable", self.temperature == 0)
+        self.cache_ttl = self.llm_config.get("cache_ttl", 3600)  # seconds
+
+        # Screenshot encoding sent to the LLM ("webp", "jpeg" or "png")
+        self.image_format = self.config.get("image_format", "webp").upper()
+        if self.image_format == "JPG":
+            self.image_format = "JPEG"
+        if self.image_format == "WEBP" and not _WEBP_AVAILABLE:
+            logger.warning("Pillow has no WebP support, encoding screenshots as JPEG")
+            self.image_format = "JPEG"
+        self.image_quality = self.config.get("image_quality", 70 if self.image_format == "WEBP" else 75)
+        self._image_mime_type = f"image/{self.image_format.lower()}"
 
         # History tracking
-        self.history_screenshots: List[Image.Image] = []
-        self.history_responses: List[str] = []  # Store full LLM responses
+        # Parallel deques of completed turns, evicting their oldest turn together;
+        # always longer than the history window so eviction never reaches it.
+        # Screenshots are kept only in encoded form, not as PIL images.
+        history_maxlen = max(self.max_history_steps, self.history_n + 1)
+        self.history_encoded: Deque[str] = deque(maxlen=history_maxlen)  # Base64 of each history screenshot, encoded once
+        self.history_responses: Deque[str] = deque(maxlen=history_maxlen)  # Store full LLM responses
+        # Index of the first stored turn sent to the LLM, and the actions of the
+        # turns before it (see _trim_history)
+        self._window_start = 0
+        self._earlier_actions: List[str] = []
+        self._earlier_actions_text = ""
         self.step_count = 0
 
+        # aiohttp session reused across LLM calls (created lazily, see _ensure_session)
+        self._session = None
+
+        # ActionCommand builders for parsed actions, keyed by action function name
+        self._cmd_builders = {
+            "click": self._create_click_command,
+            "type": self._create_type_command,
+            "scroll": self._create_scroll_command,
+            "drag": self._create_drag_command,
+        }
+        # Regex fallback parsers keyed by action function name
+        self._regex_parsers = {
+            "click": self._parse_click_action,
+            "type": self._parse_type_action,
+            "drag": self._parse_drag_action,
+            "scroll": self._parse_scroll_action,
+        }
+
         # Simplified action space definition
         self.action_space = """
 click(start_box='<|box_start|>(x1,y1)<|box_end|>')
@@ -138,7 +405,9 @@ scroll(start_box='<|box_start|>(x1,y1)<|box_end|>', direction='down or up or rig
 finished(content='xxx') # Use escape characters \\', \\", and \\n in content part to ensure we can parse the content in normal python string format.
 """
 
-        # System prompt for multi-turn conversation
+        # System prompt for multi-turn conversation. It holds no per-task data so it
+        # stays byte-identical across turns and tasks, letting the LLM server reuse
+        # its cached prefix; the instruction follows in its own user message.
         self.system_prompt = """You are a GUI agent. You are given a task and your action history, with screenshots. You need to perform the next action to complete the task.
 
 ## Output Format
@@ -154,10 +423,23 @@ Action: ...
 - Use {language} in `Thought` part.
 - Write a small plan and finally summarize your next action (with its target element) in one sentence in `Thought` part.
 - Output absolute coordinates directly based on the screenshot.
-
-## User Instruction
+"""
+        self.instruction_prompt = """## User Instruction
 {instruction}
 """
+        self._system_message = {
+            "role": "system",
+            "content": [{
+                "type": "text",
+                "text": self.system_prompt.format(
+                    action_space=self.action_space.strip(),
+                    language=self.language
+                )
+            }]
+        }
+        # Instruction message for the current task, rebuilt only when the task changes
+        self._instruction_task: Optional[str] = None
+        self._instruction_message: Optional[Dict[str, Any]] = None
 
         logger.success(f"UITARSAgent initialized with {self.max_history_steps} history steps")
     
@@ -179,11 +461,25 @@ Action: ...
             if asyncio.current_task().cancelled():
                 raise asyncio.CancelledError("Agent prediction cancelled")
 
-            # Store screenshot in history
-            self.history_screenshots.append(screenshot)
+            # Normalize to RGB once so every encoder takes its RGB path; the copy
+            # is ours, so the embedded colour profile can be dropped as well
+            if screenshot.mode != "RGB":
+                rgb_screenshot = screenshot.convert("RGB")
+                rgb_screenshot.info.pop("icc_profile", None)
+            else:
+                rgb_screenshot = screenshot
+
+            # Encode the screenshot once for all later turns, off the event loop
+            # so the encoder does not block other evaluations
+            try:
+                encoded = await asyncio.to_thread(self._image_to_base64, rgb_screenshot)
+            finally:
+                # Only the encoded form is kept, so free our converted copy now
+                if rgb_screenshot is not screenshot:
+                    rgb_screenshot.close()
 
             # Construct messages array for multi-turn conversation
-            messages = self._construct_messages(task_description)
+            messages = self._construct_messages(task_description, encoded)
 
             # Get LLM response from local server (can be cancelled)
             llm_response = await self._get_llm_response(messages)
@@ -194,10 +490,14 @@ Action: ...
             # Convert action to ActionCommand
             actions = self._convert_to_action_commands(action_text)
 
-            # Store the full LLM response in history
+            # Store this turn in history; a full deque drops its oldest turn,
+            # which shifts the window start down by one
+            if len(self.history_responses) == self.history_responses.maxlen:
+                self._window_start = max(0, self._window_start - 1)
+            self.history_encoded.append(encoded)
             self.history_responses.append(llm_response)
 
-            # Maintain history limits
+            # Advance the history window sent to the LLM
             self._trim_history()
             
             # Check if task is complete
@@ -224,78 +524,83 @@ Action: ...
     
     def _trim_history(self) -> None:
         """
-        Trim history to maintain storage limits.
+        Advance the window of turns sent to the LLM in batches.
+
+        LLM servers cache the prompt by exact prefix, so sliding the window by one
+        turn every step would invalidate the whole cached prefix on every call.
+        Instead the window grows until it holds history_n turns and then drops to
+        the newest history_n // 2 turns in one cache reset; the actions of the turns
+        that leave the window are kept in a short summary message that only changes
+        at those resets. Stored history is bounded by the history deques.
         """
-        # Maintain max_history_steps for local storage
-        if len(self.history_screenshots) > self.max_history_steps:
-            self.history_screenshots.pop(0)
-        if len(self.history_responses) > self.max_history_steps:
-            self.history_responses.pop(0)
+        window_size = len(self.history_responses) - self._window_start
+        if window_size > self.history_n:
+            keep = min(self.history_n, max(1, self.history_n // 2))
+            new_start = len(self.history_responses) - keep
+            for response in islice(self.history_responses, self._window_start, new_start):
+                _, action_text = self._parse_llm_response(response)
+                self._earlier_actions.append(action_text)
+            self._earlier_actions_text = "Earlier actions:\n" + "\n".join(
+                f"{step}. {action}" for step, action in enumerate(self._earlier_actions, 1)
+            )
+            self._window_start = new_start
+            logger.debug(f"History window cache reset: now starts at turn {new_start}")
 
-    def _construct_messages(self, task_description: str) -> List[Dict[str, Any]]:
+    def _construct_messages(self, task_description: str, current_screenshot_base64: str) -> List[Dict[str, Any]]:
         """
         Construct messages array for multi-turn conversation.
 
         Args:
             task_description: The task to perform
+            current_screenshot_base64: Encoded screenshot of the current step
 
         Returns:
             List of messages in OpenAI chat completion format
         """
-        messages = []
-
-        # Add system message
-        system_content = self.system_prompt.format(
-            action_space=self.action_space.strip(),
-            language=self.language,
-            instruction=task_description
-        )
-        messages.append({
-            "role": "system",
-            "content": [{"type": "text", "text": system_content}]
-        })
+        # Static system message (same object every turn), then the task instruction;
+        # history follows in append order so earlier turns are never rewritten
+        if task_description != self._instruction_task:
+            self._instruction_task = task_description
+            self._instruction_message = {
+                "role": "user",
+                "content": [{"type": "text", "text": self.instruction_prompt.format(instruction=task_description)}]
+            }
+        messages = [self._system_message, self._instruction_message]
+
+        # Summary of turns that have left the history window
+        if self._earlier_actions_text:
+            messages.append({
+                "role": "assistant",
+                "content": [{"type": "text", "text": self._earlier_actions_text}]
+            })
 
-        # Determine how many conversation turns to include
+        # Add historical conversation turns in the current window
         # Each turn consists of a user message (screenshot) + assistant response
-        num_history_pairs = min(len(self.history_responses), self.history_n)
-
-        # Add historical conversation turns
-        for i in range(-num_history_pairs, 0):  # Get last N pairs
-            # Add user message with historical screenshot
-            if i + len(self.history_screenshots) >= 0:
-                screenshot_idx = i + len(self.history_screenshots) - 1  # Adjust for current screenshot not yet in responses
-                if screenshot_idx >= 0 and screenshot_idx < len(self.history_screenshots):
-                    screenshot_base64 = self._image_to_base64(self.history_screenshots[screenshot_idx])
-                    messages.append({
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{screenshot_base64}"
-                                }
-                            }
-                        ]
-                    })
-
-            # Add assistant response
-            if i + len(self.history_responses) >= 0:
-                response_idx = i + len(self.history_responses)
-                if response_idx >= 0 and response_idx < len(self.history_responses):
-                    messages.append({
-                        "role": "assistant",
-                        "content": [{"type": "text", "text": self.history_responses[response_idx]}]
-                    })
+        for idx in range(self._window_start, len(self.history_responses)):
+            messages.append({
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{self._image_mime_type};base64,{self.history_encoded[idx]}"
+                        }
+                    }
+                ]
+            })
+            messages.append({
+                "role": "assistant",
+                "content": [{"type": "text", "text": self.history_responses[idx]}]
+            })
 
         # Add current screenshot as final user message
-        current_screenshot_base64 = self._image_to_base64(self.history_screenshots[-1])
         messages.append({
             "role": "user",
             "content": [
                 {
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/png;base64,{current_screenshot_base64}"
+                        "url": f"data:{self._image_mime_type};base64,{current_screenshot_base64}"
                     }
                 }
             ]
@@ -303,35 +608,38 @@ Action: ...
 
         return messages
 
-    def _image_to_base64(self, image: Image.Image) -> str:
+    def _image_to_base64(
+        self,
+        image: Image.Image,
+        image_format: Optional[str] = None,
+        quality: Optional[int] = None
+    ) -> str:
         """
         Convert PIL Image to base64 string.
 
         Args:
             image: PIL Image to convert
+            image_format: Encoding format, defaults to the configured image_format
+            quality: Lossy quality for WebP/JPEG, defaults to the configured image_quality
 
         Returns:
             Base64 encoded image string
         """
-        buffer = BytesIO()
-        image.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        image_format = image_format or self.image_format
+        quality = quality or self.image_quality
 
-    def _get_recent_screenshots(self, count: int = 3) -> List[Image.Image]:
-        """
-        Get the most recent screenshots for context.
-
-        Args:
-            count: Number of recent screenshots to return
-
-        Returns:
-            List of recent PIL Images
-        """
-        if not self.history_screenshots:
-            return []
+        buffer = BytesIO()
+        if image_format == "WEBP":
+            image.save(buffer, format="WEBP", quality=quality, method=4)
+        elif image_format == "JPEG":
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(buffer, format="JPEG", quality=quality)
+        else:
+            image.save(buffer, format=image_format)
+        # getbuffer() avoids copying the encoded stream; base64 output is pure ASCII
+        return _b64.b64encode(buffer.getbuffer()).decode("ascii")
 
-        return self.history_screenshots[-count:] if len(self.history_screenshots) >= count else self.history_screenshots
-    
     async def _get_llm_response(self, messages: List[Dict[str, Any]]) -> str:
         """
         Get response from local LLM server using messages array.
@@ -350,12 +658,30 @@ Action: ...
 
 
 
+    async def _ensure_session(self):
+        """Return the shared aiohttp session, creating it on first use.
+
+        Reusing one session keeps connections to the LLM server alive between
+        steps instead of paying connection setup on every request.
+        """
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=8, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)  # Reduced timeout
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the aiohttp session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
     async def _get_local_llm_response(self, messages: List[Dict[str, Any]]) -> str:
         """Get response from local LLM server using messages array."""
         try:
-            import aiohttp
-            import asyncio
-
             # Prepare request payload with messages array
             payload = {
                 "model": self.model_name,
@@ -364,29 +690,47 @@ Action: ...
                 "max_tokens": self.max_tokens
             }
 
+            # Serialize once up front; the payload carries several base64 screenshots
+            url = f"{self.server_url}{self.endpoint}"
+            body = _dumps_payload(payload)
+
+            # Identical request (same model, task, history and screenshots) seen before
+            cache_key = None
+            if self.cacheable:
+                cache_key = hashlib.blake2b(url.encode("utf-8") + b"\x00" + body, digest_size=16).digest()
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    logger.info(f"\nLocal LLM response (cached): \n{cached}")
+                    return cached
+
             # Make request to local server with cancellation support
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.post(
-                        f"{self.server_url}{self.endpoint}",
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=30)  # Reduced timeout
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            pipe_result=result["choices"][0]["message"]["content"]
-                            res=pipe_result[0]['generated_text'][-1]['content']
-                            logger.info(f"\nLocal LLM response: \n{res}")
-                            return res
+            session = await self._ensure_session()
+            try:
+                async with session.post(
+                    url,
+                    data=body,
+                    headers={"Content-Type": "application/json"}
+                ) as response:
+                    if response.status == 200:
+                        if HAS_ORJSON:
+                            result = orjson.loads(await response.read())
                         else:
-                            logger.error(f"Local LLM server error: {response.status}")
-                            return self._get_placeholder_response()
-                except asyncio.CancelledError:
-                    logger.info("LLM request cancelled due to interrupt")
-                    raise
-                except asyncio.TimeoutError:
-                    logger.warning("LLM request timeout")
-                    return self._get_placeholder_response()
+                            result = await response.json()
+                        pipe_result=result["choices"][0]["message"]["content"]
+                        res=pipe_result[0]['generated_text'][-1]['content']
+                        logger.info(f"\nLocal LLM response: \n{res}")
+                        if cache_key is not None:
+                            self._cache_put(cache_key, res)
+                        return res
+                    else:
+                        logger.error(f"Local LLM server error: {response.status}")
+                        return self._get_placeholder_response()
+            except asyncio.CancelledError:
+                logger.info("LLM request cancelled due to interrupt")
+                raise
+            except asyncio.TimeoutError:
+                logger.warning("LLM request timeout")
+                return self._get_placeholder_response()
 
         except asyncio.CancelledError:
             logger.info("LLM request cancelled")
@@ -395,6 +739,25 @@ Action: ...
             logger.error(f"Local LLM error: {e}")
             return self._get_placeholder_response()
 
+    def _cache_get(self, key: bytes) -> Optional[str]:
+        """Return a cached response that is younger than cache_ttl, or None."""
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if time.monotonic() - stored_at > self.cache_ttl:
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return response
+
+    def _cache_put(self, key: bytes, response: str) -> None:
+        """Store a response, evicting the least recently used entry when full."""
+        _RESPONSE_CACHE[key] = (time.monotonic(), response)
+        _RESPONSE_CACHE.move_to_end(key)
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+
     def _get_placeholder_response(self) -> str:
         """Get a placeholder response when LLM is not available."""
         return """
@@ -425,17 +788,15 @@ Action: wait()
             response = response.strip()
 
             # Support multiple thought patterns like reference implementation
-            if response.startswith("Thought:"):
-                thought_pattern = r"Thought:\s*(.*?)(?=\s*Action:|$)"
-            elif response.startswith("Reflection:"):
-                thought_pattern = r"Reflection:\s*(.*?)Action_Summary:\s*(.*?)(?=\s*Action:|$)"
+            if response.startswith("Reflection:"):
+                thought_re = _REFLECTION_RE
             elif response.startswith("Action_Summary:"):
-                thought_pattern = r"Action_Summary:\s*(.*?)(?=\s*Action:|$)"
+                thought_re = _ACTION_SUMMARY_RE
             else:
-                thought_pattern = r"Thought:\s*(.*?)(?=\s*Action:|$)"
+                thought_re = _THOUGHT_RE
 
             # Extract thought/reflection
-            thought_match = re.search(thought_pattern, response, re.DOTALL | re.IGNORECASE)
+            thought_match = thought_re.search(response)
             if thought_match:
                 if len(thought_match.groups()) == 1:
                     thought = thought_match.group(1).strip()
@@ -445,30 +806,25 @@ Action: wait()
                     action_summary = thought_match.group(2).strip()
                     thought = f"Reflection: {reflection}\nAction Summary: {action_summary}"
 
-            # Extract action - must have "Action:" in response
-            if "Action:" in response:
-                action_text = response.split("Action:")[-1].strip()
-
-                # Clean up action text - remove trailing content after action
-                action_lines = action_text.split('\n')
+            # Extract action - must have "Action:" in response (text after the last one)
+            _, action_marker, action_text = response.rpartition("Action:")
+            if action_marker:
+                # Single pass over the action lines: skip blanks and comments, stop at a
+                # code block end, and take the first line that looks like a call
                 clean_action_lines = []
-
-                for line in action_lines:
+                for line in action_text.splitlines():
                     line = line.strip()
-                    if line and not line.startswith('#') and not line.startswith('```'):
-                        clean_action_lines.append(line)
-                    elif line.startswith('```'):
+                    if not line or line.startswith('#'):
+                        continue
+                    if line.startswith('```'):
                         break  # Stop at code block end
+                    if '(' in line and ')' in line:
+                        clean_action_lines = [line]
+                        break
+                    clean_action_lines.append(line)
 
-                action_text = '\n'.join(clean_action_lines).strip()
-
-                # If multiple lines, take the first valid action
-                if '\n' in action_text:
-                    for line in action_text.split('\n'):
-                        line = line.strip()
-                        if line and ('(' in line and ')' in line):
-                            action_text = line
-                            break
+                # No call-like line: keep all remaining action lines
+                action_text = '\n'.join(clean_action_lines)
             else:
                 logger.warning("No 'Action:' found in response")
                 action_text = "wait()"
@@ -496,46 +852,56 @@ Action: wait()
         action_text = action_text.strip()
 
         try:
-            # Handle multiple actions separated by double newlines (like reference implementation)
-            action_strings = action_text.split('\n\n')
+            # Common case: a single action, no splitting needed
+            if '\n\n' not in action_text:
+                action_cmd = self._convert_single_action(action_text) if action_text else None
+                if action_cmd:
+                    actions.append(action_cmd)
+                return actions
 
-            for action_str in action_strings:
+            # Handle multiple actions separated by double newlines (like reference implementation)
+            for action_str in action_text.split('\n\n'):
                 action_str = action_str.strip()
                 if not action_str:
                     continue
-
-                # Special handling for type actions with content parameter
-                if "type(content" in action_str:
-                    action_str = self._preprocess_type_action(action_str)
-
-                # Try AST parsing first (more reliable)
-                parsed_action = parse_action_ast(action_str)
-                if parsed_action:
-                    action_cmd = self._convert_parsed_action_to_command(parsed_action)
-                    if action_cmd:
-                        actions.append(action_cmd)
-                        continue
-                    # Check if this is a finish action (which doesn't create ActionCommand)
-                    elif parsed_action.get('function') in ['finish', 'finished']:
-                        logger.info(f"Task completion action detected: {action_str}")
-                        continue
-
-                # Fallback to regex parsing for compatibility
-                action_cmd = self._parse_action_with_regex(action_str)
+                action_cmd = self._convert_single_action(action_str)
                 if action_cmd:
                     actions.append(action_cmd)
-                else:
-                    # Check if this is a finish action before warning
-                    if self._is_task_complete(action_str):
-                        logger.info(f"Task completion action detected: {action_str}")
-                    else:
-                        logger.warning(f"Could not parse action: {action_str}")
 
         except Exception as e:
             logger.error(f"Error converting action '{action_text}': {e}")
 
         return actions
 
+    def _convert_single_action(self, action_str: str) -> Optional[ActionCommand]:
+        """Convert one stripped, non-empty action string to an ActionCommand."""
+        # Special handling for type actions with content parameter
+        if "type(content" in action_str:
+            action_str = self._preprocess_type_action(action_str)
+
+        # Try AST parsing first (more reliable)
+        parsed_action = parse_action_ast(action_str)
+        if parsed_action:
+            action_cmd = self._convert_parsed_action_to_command(parsed_action)
+            if action_cmd:
+                return action_cmd
+            # Check if this is a finish action (which doesn't create ActionCommand)
+            elif parsed_action.get('function') in _FINISH_FUNCTIONS:
+                logger.info(f"Task completion action detected: {action_str}")
+                return None
+
+        # Fallback to regex parsing for compatibility
+        action_cmd = self._parse_action_with_regex(action_str)
+        if action_cmd:
+            return action_cmd
+
+        # Check if this is a finish action before warning
+        if self._is_task_complete(action_str):
+            logger.info(f"Task completion action detected: {action_str}")
+        else:
+            logger.warning(f"Could not parse action: {action_str}")
+        return None
+
     def _preprocess_type_action(self, action_str: str) -> str:
         """Preprocess type action to handle content parameter properly."""
         try:
@@ -544,8 +910,7 @@ Action: wait()
                 content = match.group(1)
                 return content
 
-            pattern = r"type\(content='(.*?)'\)"
-            content = re.sub(pattern, escape_quotes, action_str)
+            content = _TYPE_CONTENT_RE.sub(escape_quotes, action_str)
 
             # Escape single quotes in content
             content = escape_single_quotes(content)
@@ -561,20 +926,14 @@ Action: wait()
             args = parsed_action['args']
             positional_args = parsed_action.get('positional_args', [])
 
-            if action_type == "click":
-                return self._create_click_command(args, positional_args)
-            elif action_type == "type":
-                return self._create_type_command(args, positional_args)
-            elif action_type == "scroll":
-                return self._create_scroll_command(args, positional_args)
-            elif action_type == "drag":
-                return self._create_drag_command(args, positional_args)
-            elif action_type in ["finish", "finished"]:
+            builder = self._cmd_builders.get(action_type)
+            if builder:
+                return builder(args, positional_args)
+            if action_type in _FINISH_FUNCTIONS:
                 # Task completion handled elsewhere
                 return None
-            else:
-                logger.warning(f"Unknown action type: {action_type}")
-                return None
+            logger.warning(f"Unknown action type: {action_type}")
+            return None
 
         except Exception as e:
             logger.error(f"Error converting parsed action: {e}")
@@ -583,7 +942,17 @@ Action: wait()
     def _parse_action_with_regex(self, action_text: str) -> Optional[ActionCommand]:
         """Fallback regex parsing for action strings."""
         try:
-            # Handle core action types
+            # Dispatch on the function name when the text starts with a call
+            head = _ACTION_RE.match(action_text)
+            if head:
+                func_name = head.group(1).rsplit(".", 1)[-1]
+                parser = self._regex_parsers.get(func_name)
+                if parser:
+                    return parser(action_text)
+                if func_name in _FINISH_FUNCTIONS:
+                    return None  # Task completion handled elsewhere
+
+            # Otherwise look for a known call anywhere in the text
             if "click(" in action_text:
                 return self._parse_click_action(action_text)
             elif "type(" in action_text:
@@ -700,7 +1069,7 @@ Action: wait()
                     if coords:
                         x, y = coords[0], coords[1]
 
-            if direction in ["down", "up", "left", "right"]:
+            if direction in _SCROLL_DIRECTIONS:
                 parameters = {
                     "direction": direction,
                     "amount": 100,
@@ -771,9 +1140,8 @@ Action: wait()
     def _extract_coordinates_from_box(self, box_str: str) -> Optional[Tuple[int, int]]:
         """Extract coordinates from box string like '(100,200)'."""
         try:
-            # Remove parentheses and split by comma
-            coords_str = str(box_str).replace("(", "").replace(")", "")
-            coords = coords_str.split(",")
+            # First two numbers in one scan; wrappers like <|box_start|> are skipped
+            coords = _NUM_RE.findall(str(box_str))
 
             if len(coords) >= 2:
                 x, y = int(float(coords[0])), int(float(coords[1]))
@@ -786,21 +1154,15 @@ Action: wait()
 
     def _parse_click_action(self, action_text: str) -> Optional[ActionCommand]:
         """Parse click action with absolute coordinates."""
+        # Cheap rejection before running the regex engine
+        if "click(" not in action_text:
+            return None
         try:
-            # Extract coordinates from click(x, y) format
-            match = re.search(r'click\((\d+),\s*(\d+)\)', action_text)
+            # click(x, y) or UITARS format click(start_box='(x,y)')
+            match = _CLICK_RE.search(action_text)
             if match:
-                x, y = int(match.group(1)), int(match.group(2))
-                return ActionCommand(
-                    action_type="click",
-                    parameters={"x": x, "y": y},
-                    description=f"Click at coordinates ({x}, {y})"
-                )
-
-            # Also handle UITARS format: click(start_box='(x,y)')
-            uitars_match = re.search(r'click\(start_box=[\'"]?\([\'"]?(\d+),\s*(\d+)[\'"]?\)[\'"]?\)', action_text)
-            if uitars_match:
-                x, y = int(uitars_match.group(1)), int(uitars_match.group(2))
+                x = int(match.group("x") or match.group("bx"))
+                y = int(match.group("y") or match.group("by"))
                 return ActionCommand(
                     action_type="click",
                     parameters={"x": x, "y": y},
@@ -812,26 +1174,18 @@ Action: wait()
 
     def _parse_drag_action(self, action_text: str) -> Optional[ActionCommand]:
         """Parse drag action with absolute coordinates."""
+        # Cheap rejection before running the regex engine
+        if "drag(" not in action_text:
+            return None
         try:
-            # Extract coordinates from drag(start_x, start_y, end_x, end_y) format
-            match = re.search(r'drag\((\d+),\s*(\d+),\s*(\d+),\s*(\d+)\)', action_text)
+            # drag(start_x, start_y, end_x, end_y) or UITARS format
+            # drag(start_box='(x1,y1)', end_box='(x2,y2)')
+            match = _DRAG_RE.search(action_text)
             if match:
-                start_x, start_y, end_x, end_y = map(int, match.groups())
-                return ActionCommand(
-                    action_type="drag",
-                    parameters={
-                        "start_x": start_x,
-                        "start_y": start_y,
-                        "end_x": end_x,
-                        "end_y": end_y
-                    },
-                    description=f"Drag from ({start_x}, {start_y}) to ({end_x}, {end_y})"
-                )
-
-            # Also handle UITARS format: drag(start_box='(x1,y1)', end_box='(x2,y2)')
-            uitars_match = re.search(r'drag\(start_box=[\'"]?\([\'"]?(\d+),\s*(\d+)[\'"]?\)[\'"]?,\s*end_box=[\'"]?\([\'"]?(\d+),\s*(\d+)[\'"]?\)[\'"]?\)', action_text)
-            if uitars_match:
-                start_x, start_y, end_x, end_y = map(int, uitars_match.groups())
+                start_x = int(match.group("sx") or match.group("bsx"))
+                start_y = int(match.group("sy") or match.group("bsy"))
+                end_x = int(match.group("ex") or match.group("bex"))
+                end_y = int(match.group("ey") or match.group("bey"))
                 return ActionCommand(
                     action_type="drag",
                     parameters={
@@ -848,150 +1202,89 @@ Action: wait()
 
     def _parse_type_action(self, action_text: str) -> Optional[ActionCommand]:
         """Parse type action."""
+        # Cheap rejection before running the regex engine
+        if "type(" not in action_text:
+            return None
         try:
-            # First try UITARS format: type(content='text')
-            uitars_match = re.search(r'type\(content=[\'"]([^\'"]*)[\'"]', action_text)
-            if uitars_match:
-                text = uitars_match.group(1)
-                # Handle escape sequences
-                text = text.replace('\\n', '\n').replace('\\"', '"').replace("\\'", "'")
-
-                # Check for delete operations
-                if text.lower() in ['delete', 'backspace']:
-                    return ActionCommand(
-                        action_type="input_text",
-                        parameters={"text": text},
-                        description=f"Delete operation: {text}"
-                    )
+            # UITARS format type(content='text') or simplified format type(content)
+            match = _TYPE_RE.search(action_text)
+            if not match:
+                return None
 
+            text = match.group("content")
+            if text is None:
+                text = match.group("raw").strip('\'"')
                 return ActionCommand(
                     action_type="input_text",
                     parameters={"text": text},
                     description=f"Type text: {text[:50]}{'...' if len(text) > 50 else ''}"
                 )
 
-            # Then try simplified format: type(content)
-            match = re.search(r'type\(([^)]+)\)', action_text)
-            if match:
-                text = match.group(1).strip('\'"')
+            # Handle escape sequences
+            text = _UNESCAPE_RE.sub(lambda m: _UNESCAPE_MAP[m.group(1)], text)
+
+            # Check for delete operations
+            if text.lower() in ['delete', 'backspace']:
                 return ActionCommand(
                     action_type="input_text",
                     parameters={"text": text},
-                    description=f"Type text: {text[:50]}{'...' if len(text) > 50 else ''}"
+                    description=f"Delete operation: {text}"
                 )
+
+            return ActionCommand(
+                action_type="input_text",
+                parameters={"text": text},
+                description=f"Type text: {text[:50]}{'...' if len(text) > 50 else ''}"
+            )
         except Exception as e:
             logger.error(f"Error parsing type action: {e}")
         return None
 
     def _parse_scroll_action(self, action_text: str) -> Optional[ActionCommand]:
         """Parse scroll action."""
+        # Cheap rejection before running the regex engine
+        if "scroll(" not in action_text:
+            return None
         try:
-            # Handle coordinate-based scroll: scroll(x=100, y=200, direction='down')
-            coord_match = re.search(r'scroll\(x=(\d+),\s*y=(\d+),\s*direction=[\'"]([^\'"]+)[\'"]', action_text)
-            if coord_match:
-                x, y = int(coord_match.group(1)), int(coord_match.group(2))
-                direction = coord_match.group(3).lower()
-
-                direction_map = {
-                    "down": "down",
-                    "up": "up",
-                    "left": "left",
-                    "right": "right"
-                }
-
-                if direction in direction_map:
-                    return ActionCommand(
-                        action_type="scroll",
-                        parameters={
-                            "direction": direction_map[direction],
-                            "amount": 100,
-                            "dx": 0,
-                            "dy": 0,
-                            "x": x,
-                            "y": y
-                        },
-                        description=f"Scroll {direction} from coordinates ({x}, {y})"
-                    )
-
-            # Handle three-parameter format: scroll(x, y, direction)
-            three_param_match = re.search(r'scroll\((\d+),\s*(\d+),\s*[\'"]?([^\'")\s]+)[\'"]?\)', action_text)
-            if three_param_match:
-                x, y = int(three_param_match.group(1)), int(three_param_match.group(2))
-                direction = three_param_match.group(3).lower()
-
-                direction_map = {
-                    "down": "down",
-                    "up": "up",
-                    "left": "left",
-                    "right": "right"
-                }
-
-                if direction in direction_map:
-                    return ActionCommand(
-                        action_type="scroll",
-                        parameters={
-                            "direction": direction_map[direction],
-                            "amount": 100,
-                            "dx": 0,
-                            "dy": 0,
-                            "x": x,
-                            "y": y
-                        },
-                        description=f"Scroll {direction} from coordinates ({x}, {y})"
-                    )
-
-            # Extract direction from scroll(direction) format
-            match = re.search(r'scroll\(([^)]+)\)', action_text)
-            if match:
-                direction = match.group(1).strip('\'"').lower()
-
-                # Map directions to our framework
-                direction_map = {
-                    "down": "down",
-                    "up": "up",
-                    "left": "left",
-                    "right": "right"
-                }
+            # scroll(x=100, y=200, direction='down'), scroll(x, y, direction),
+            # UITARS format scroll(start_box='(x,y)', direction='down') or scroll(direction)
+            match = _SCROLL_RE.search(action_text)
+            if not match:
+                return None
 
-                if direction in direction_map:
+            if match.group("d") is not None:
+                # Direction only
+                direction = match.group("d").strip('\'"').lower()
+                if direction in _SCROLL_DIRECTIONS:
                     return ActionCommand(
                         action_type="scroll",
                         parameters={
-                            "direction": direction_map[direction],
+                            "direction": direction,
                             "amount": 100,  # Default scroll amount
                             "dx": 0,
                             "dy": 0
                         },
                         description=f"Scroll {direction}"
                     )
+                return None
 
-            # Also handle UITARS format: scroll(start_box='(x,y)', direction='down')
-            uitars_match = re.search(r'scroll\(start_box=[\'"]?\(([\'"]?\d+),\s*(\d+[\'"]?)\)[\'"]?,\s*direction=[\'"]([^\'"]+)[\'"]', action_text)
-            if uitars_match:
-                x = int(uitars_match.group(1).strip('\'"'))
-                y = int(uitars_match.group(2).strip('\'"'))
-                direction = uitars_match.group(3).lower()
-
-                direction_map = {
-                    "down": "down",
-                    "up": "up",
-                    "left": "left",
-                    "right": "right"
-                }
-
-                if direction in direction_map:
-                    return ActionCommand(
-                        action_type="scroll",
-                        parameters={
-                            "direction": direction_map[direction],
-                            "amount": 100,  # Default scroll amount
-                            "dx": 0,
-                            "dy": 0,
-                            "x": x,
-                            "y": y
-                        },
-                        description=f"Scroll {direction} from coordinates ({x}, {y})"
-                    )
+            # Coordinate-based scroll in one of the three formats
+            x = int(match.group("cx") or match.group("tx") or match.group("ux"))
+            y = int(match.group("cy") or match.group("ty") or match.group("uy"))
+            direction = (match.group("cd") or match.group("td") or match.group("ud")).lower()
+            if direction in _SCROLL_DIRECTIONS:
+                return ActionCommand(
+                    action_type="scroll",
+                    parameters={
+                        "direction": direction,
+                        "amount": 100,  # Default scroll amount
+                        "dx": 0,
+                        "dy": 0,
+                        "x": x,
+                        "y": y
+                    },
+                    description=f"Scroll {direction} from coordinates ({x}, {y})"
+                )
         except Exception as e:
             logger.error(f"Error parsing scroll action: {e}")
         return None
@@ -1006,14 +1299,19 @@ Action: wait()
         Returns:
             True if task is complete
         """
-        return "finish()" in action_text.lower() or "finished(" in action_text.lower()
+        action_text = action_text.lower()
+        return "finish()" in action_text or "finished(" in action_text
     
     async def reset(self) -> None:
         """Reset agent state."""
         await super().reset()
-        self.history_screenshots.clear()
+        self.history_encoded.clear()
         self.history_responses.clear()
+        self._window_start = 0
+        self._earlier_actions.clear()
+        self._earlier_actions_text = ""
         self.step_count = 0
+        await self.aclose()
         logger.info("UITARSAgent reset")
     
     def get_capabilities(self) -> List[str]:
@@ -1030,6 +1328,8 @@ Action: wait()
             "language": self.language,
             "model_name": self.model_name,
             "server_url": self.server_url,
+            "image_format": self.image_format,
+            "response_cache": self.cacheable,
             "steps_processed": self.step_count
         })
         return info
@@ -623,6 +623,9 @@ class EvaluationController:
 
             if self.agent:
                 await self.agent.reset()
+                # Release pooled connections held by LLM-backed agents
+                if hasattr(self.agent, "aclose"):
+                    await self.agent.aclose()
                 self.agent = None
 
             # Remove log handler to prevent duplication
@@ -28,6 +28,9 @@ IGNORED_ACTREE_PROPERTIES = (
     "invalid",
 )
 
+# Reads (innerWidth, innerHeight) in a single evaluate
+_VIEWPORT_JS = "() => ({ width: window.innerWidth, height: window.innerHeight })"
+
 # Type definitions for text extraction
 class DOMNode(TypedDict):
     nodeId: str
@@ -98,6 +101,10 @@ class WebEnvironment:
         # Text extraction metadata
         self.text_extraction_metadata: TextExtractionMetadata = {"obs_nodes_info": {}}
 
+        # Cached (innerWidth, innerHeight); refreshed on every text extraction and
+        # dropped on navigation, since it rarely changes between steps
+        self._viewport_size: Optional[Tuple[int, int]] = None
+
         logger.info("WebEnvironment initialized")
 
     async def initialize(self) -> None:
@@ -234,6 +241,7 @@ class WebEnvironment:
             await asyncio.sleep(0.2)
 
             self.current_url = url_or_path
+            self._viewport_size = None
             logger.info(f"Navigated to: {url_or_path}")
 
             return True
@@ -633,6 +641,7 @@ class WebEnvironment:
                 # Navigate to blank page
                 await self.page.goto("about:blank")
                 self.current_url = None
+                self._viewport_size = None
 
                 logger.info("Browser reset to clean state")
                 return True
@@ -674,6 +683,7 @@ class WebEnvironment:
             self.is_initialized = False
             # Reset text extraction metadata
             self.text_extraction_metadata = {"obs_nodes_info": {}}
+            self._viewport_size = None
             logger.info("Browser cleanup completed")
 
         except Exception as e:
@@ -696,7 +706,8 @@ class WebEnvironment:
         )
 
         # Get viewport size for bounds calibration
-        viewport = await self.page.evaluate("() => ({ width: window.innerWidth, height: window.innerHeight })")
+        viewport = await self.page.evaluate(_VIEWPORT_JS)
+        self._viewport_size = (viewport["width"], viewport["height"])
 
         # Calibrate the bounds - in some cases, the bounds are scaled somehow
         bounds = tree["documents"][0]["layout"]["bounds"]
@@ -1204,10 +1215,17 @@ class WebEnvironment:
         return tree_str, obs_nodes_info
 
     @staticmethod
-    def clean_accessibility_tree(tree_str: str) -> str:
-        """Further clean accessibility tree by removing redundant StaticText nodes."""
+    def clean_accessibility_tree(tree_str: str, max_chars: Optional[int] = None) -> str:
+        """
+        Further clean accessibility tree by removing redundant StaticText nodes.
+
+        If max_chars is given, stop once the kept lines exceed that many characters.
+        """
         clean_lines: List[str] = []
+        kept_chars = 0
         for line in tree_str.split("\n"):
+            if max_chars is not None and kept_chars > max_chars:
+                break
             # Remove statictext if the content already appears in the previous line
             if "statictext" in line.lower():
                 prev_lines = clean_lines[-3:]
@@ -1221,15 +1239,18 @@ class WebEnvironment:
                         for prev_line in prev_lines
                     ):
                         clean_lines.append(line)
+                        kept_chars += len(line) + 1
             else:
                 clean_lines.append(line)
+                kept_chars += len(line) + 1
 
         return "\n".join(clean_lines)
 
     async def get_page_text_info(
         self,
         observation_type: str = "accessibility_tree",
-        current_viewport_only: bool = True
+        current_viewport_only: bool = True,
+        max_chars: Optional[int] = None
     ) -> str:
         """
         Extract text information from the current page.
@@ -1237,6 +1258,8 @@ class WebEnvironment:
         Args:
             observation_type: Type of text extraction ("html" or "accessibility_tree")
             current_viewport_only: Whether to only include elements in current viewport
+            max_chars: If given, the returned text is cut to at most this many characters
+                and tree cleaning stops early once the limit is reached
 
         Returns:
             String representation of the page structure with text information
@@ -1287,7 +1310,7 @@ class WebEnvironment:
                 content, obs_nodes_info = self.parse_accessibility_tree(
                     accessibility_tree
                 )
-                content = self.clean_accessibility_tree(content)
+                content = self.clean_accessibility_tree(content, max_chars=max_chars)
                 self.text_extraction_metadata["obs_nodes_info"] = obs_nodes_info
 
             else:
@@ -1297,12 +1320,21 @@ class WebEnvironment:
 
             # Combine tab information with content
             full_content = f"{tab_title_str}\n\n{content}"
+            if max_chars is not None:
+                full_content = full_content[:max_chars]
             return full_content
 
         except Exception as e:
             logger.error(f"Failed to extract page text info: {e}")
             return ""
 
+    async def get_viewport_size(self) -> Tuple[int, int]:
+        """Get (innerWidth, innerHeight), evaluating in the page only when not cached."""
+        if self._viewport_size is None:
+            viewport = await self.page.evaluate(_VIEWPORT_JS)
+            self._viewport_size = (viewport["width"], viewport["height"])
+        return self._viewport_size
+
     async def get_element_center(self, element_id: str) -> Optional[Tuple[float, float]]:
         """
         Get the center coordinates of an element identified by its ID.
@@ -1328,18 +1360,56 @@ class WebEnvironment:
             center_x = x + width / 2
             center_y = y + height / 2
 
-            # Get viewport size
-            viewport = await self.page.evaluate("() => ({ width: window.innerWidth, height: window.innerHeight })")
+            width, height = await self.get_viewport_size()
 
             return (
-                center_x / viewport["width"],
-                center_y / viewport["height"],
+                center_x / width,
+                center_y / height,
             )
 
         except Exception as e:
             logger.error(f"Failed to get element center for {element_id}: {e}")
             return None
 
+    async def get_elements_screen_points(self, element_ids: List[str]) -> Dict[str, Tuple[int, int]]:
+        """
+        Get the centers of several elements in screen pixels.
+
+        The CSS-pixel centers are scaled by the configured device_scale_factor,
+        the same factor click/scroll/drag divide by, so a point returned here
+        lands on the element when passed back to those actions.
+
+        Args:
+            element_ids: Element IDs from text extraction
+
+        Returns:
+            Dict mapping each element ID that was found to its (x, y) center
+        """
+        bounds = self._get_element_bounds(element_ids)
+        if not bounds:
+            return {}
+
+        device_scale_factor = self.browser_config.get("device_scale_factor", 1.0)
+        return {
+            element_id: (
+                round((x + w / 2) * device_scale_factor),
+                round((y + h / 2) * device_scale_factor),
+            )
+            for element_id, (x, y, w, h) in bounds.items()
+        }
+
+    def _get_element_bounds(self, element_ids: List[str]) -> Dict[str, List[float]]:
+        """Look up the union bounds of extracted elements, skipping unknown or empty ones."""
+        obs_nodes_info = self.text_extraction_metadata["obs_nodes_info"]
+        bounds = {}
+        for element_id in element_ids:
+            node_info = obs_nodes_info.get(element_id)
+            if node_info is None:
+                logger.warning(f"Element ID {element_id} not found in extracted nodes")
+            elif node_info["union_bound"]:
+                bounds[element_id] = node_info["union_bound"]
+        return bounds
+
     async def get_text_extraction_metadata(self) -> TextExtractionMetadata:
         """Get metadata from the last text extraction operation."""
         return self.text_extraction_metadata
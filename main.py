@@ -29,6 +29,13 @@ def signal_handler(signum, frame):
         sys.exit(1)
 
 
+async def close_shared_llm_clients():
+    """Close the LLM connection pool shared by TextAgent instances, if one was used."""
+    text_agent_module = sys.modules.get("agent_eval.agent.text_agent")
+    if text_agent_module is not None:
+        await text_agent_module.close_shared_clients()
+
+
 async def run_evaluation(task: str, url: str = None, headless: bool = False, agent_type: str = "human"):
     """Run a single evaluation."""
     config = DEFAULT_CONFIG.copy()
@@ -68,6 +75,9 @@ async def run_evaluation(task: str, url: str = None, headless: bool = False, age
         print(f"❌ Evaluation failed: {e}")
         return None
 
+    finally:
+        await close_shared_llm_clients()
+
 
 async def run_batch_evaluation(config_file: str, progress: bool = True, resume_checkpoint: str = None,
                               num_runs: int = None, list_checkpoints: bool = False, output_dir: str = None):
@@ -175,6 +185,9 @@ async def run_batch_evaluation(config_file: str, progress: bool = True, resume_c
         print(f"❌ Batch evaluation failed: {e}")
         return None
 
+    finally:
+        await close_shared_llm_clients()
+
 
 async def list_available_checkpoints(config_file: str):
     """List available checkpoint files."""